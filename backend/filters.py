@@ -0,0 +1,82 @@
+import json
+import os
+from pathlib import Path
+
+# Filter vocabularies are precomputed by ingest and stored next to the Chroma DB
+CHROMA_PATH = os.getenv("CHROMA_DB_PATH", str(Path(__file__).parent.parent / "chroma_db"))
+FILTERS_PATH = os.path.join(CHROMA_PATH, "filters.json")
+
+# The only CSV columns build_filters looks at
+FILTER_COLUMNS = ["affiliation", "authors", "neurips_session", "neurips_starttime"]
+
+# Known conference dates (Dec 1-7, 2025), used when no start times are available
+DEFAULT_DAYS = [
+    "2025-12-01",
+    "2025-12-02",
+    "2025-12-03",
+    "2025-12-04",
+    "2025-12-05",
+    "2025-12-06",
+    "2025-12-07",
+]
+
+def build_filters(df):
+    """
+    Compute the filter vocabularies (affiliations, authors, sessions, days)
+    from the combined papers/events/expo DataFrame.
+    """
+    # Helper to split and clean: values may hold several names separated by
+    # ';' or ',' (the ingest script split by comma/semicolon). Done with pandas
+    # string ops rather than a Python loop over every cell.
+    def get_unique(col):
+        if col not in df.columns: return []
+        parts = (
+            df[col].dropna().astype(str)
+            .str.replace(';', ',', regex=False)
+            .str.split(',')
+            .explode()
+            .str.strip()
+        )
+        return sorted(parts[parts != ""].unique().tolist())
+
+    # Derive day list (Tue to Sun) from both CSVs
+    # Prefer actual values present in neurips_starttime
+    # Filter out Monday (Dec 1) - events in Mexico, not San Diego
+    days = []
+    if "neurips_starttime" in df.columns:
+        dates = df["neurips_starttime"].dropna().astype(str).str.split('T').str[0]
+        # Filter: San Diego events only (Tue Dec 2 - Sun Dec 7)
+        dates = dates[(dates >= "2025-12-02") & (dates <= "2025-12-07")]
+        days = sorted(dates.unique().tolist())
+    # If empty, fall back to known conference dates
+    if not days:
+        days = list(DEFAULT_DAYS)
+
+    # Build sessions excluding any Mexico City related entries
+    raw_sessions = get_unique("neurips_session")
+    sessions = [s for s in raw_sessions if 'mexico' not in s.lower()]
+
+    return {
+        "affiliations": get_unique("affiliation"),
+        "authors": get_unique("authors"),
+        "sessions": sessions,
+        "days": days,
+        "ampm": ["AM", "PM"]
+    }
+
+def write_filters(filters, path=FILTERS_PATH):
+    """Persist filter vocabularies as JSON (written by ingest)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(filters, f)
+    # Atomic swap so the API never reads a half-written file
+    os.replace(tmp_path, path)
+
+def load_filters(path=FILTERS_PATH):
+    """Load precomputed filter vocabularies, or None if ingest hasn't written them."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
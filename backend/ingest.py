@@ -1,9 +1,13 @@
 import pandas as pd
+import numpy as np
 import chromadb
-from chromadb.utils import embedding_functions
 import os
+import sys
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from sentence_transformers import SentenceTransformer
-import ast
+import torch
+from backend.filters import FILTERS_PATH, build_filters, write_filters
 
 # Configuration
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -12,35 +16,183 @@ EVENTS_CSV_PATH = os.path.join(BASE_DIR, "data", "neurips_2025_enriched_events.c
 EXPO_CSV_PATH = os.path.join(BASE_DIR, "data", "neurips_2025_expo_events.csv")
 CHROMA_PATH = os.getenv("CHROMA_DB_PATH", os.path.join(BASE_DIR, "chroma_db"))
 COLLECTION_NAME = "neurips_papers"
+# HNSW index settings for a newly created collection. Large batch/sync sizes
+# let bulk inserts go into the index in a few big updates and flush to disk
+# rarely, rather than every 100/1000 vectors (Chroma's defaults).
+HNSW_METADATA = {
+    "hnsw:construction_ef": 100,
+    "hnsw:M": 16,
+    "hnsw:batch_size": 10000,
+    "hnsw:sync_threshold": 50000,
+}
+# Only these CSV columns are used downstream; everything else is skipped at parse time
+INGEST_COLUMNS = [
+    'title', 'authors', 'affiliation', 'neurips_abstract', 'neurips_paper_url',
+    'neurips_virtualsite_url', 'openreview_urls', 'neurips_starttime',
+    'neurips_event_type', 'neurips_session', 'neurips_poster_position', 'avg_rating',
+]
 MODEL_NAME = "all-MiniLM-L6-v2"
+# Ingest embedding backend: "torch" (default) or "onnx" for ONNX Runtime,
+# which needs the optional extra: pip install -e ".[onnx]"
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# ONNX graph to load from the model repo, e.g. "onnx/model_O3.onnx" for the
+# graph-optimized export. Defaults to the plain "onnx/model.onnx".
+ONNX_MODEL_FILE = os.getenv("ONNX_MODEL_FILE")
+# Set to "1" to dynamically quantize the torch model's Linear layers to int8
+# when encoding on CPU. For ONNX, point ONNX_MODEL_FILE at one of the
+# pre-quantized graphs instead (e.g. "onnx/model_qint8_avx512_vnni.onnx").
+EMBEDDING_QUANTIZE = os.getenv("EMBEDDING_QUANTIZE", "0") == "1"
+# The int8 model is only used if its embeddings of QUANTIZE_CHECK_SAMPLE stay
+# within this cosine distance of the fp32 ones (queries are encoded in fp32)
+QUANTIZE_TOLERANCE = 1e-3
+QUANTIZE_CHECK_SAMPLE = [
+    "Title: Attention Is All You Need\nAbstract: We propose the Transformer, a model architecture based solely on attention mechanisms.",
+    "Title: Denoising Diffusion Probabilistic Models\nAbstract: We present high quality image synthesis results using diffusion probabilistic models.",
+    "Title: Deep Reinforcement Learning from Human Preferences\nAbstract: We explore goals defined in terms of human preferences between pairs of trajectory segments.",
+    "Workshop on Machine Learning for Climate Change",
+]
+# Number of worker processes to spread CPU encoding over (e.g. the number of
+# physical cores). 1 encodes in the current process.
+EMBEDDING_PROCESSES = int(os.getenv("EMBEDDING_PROCESSES", "1"))
+# Run the torch model in fp16 when ingesting on a GPU; set to "0" to keep fp32.
+EMBEDDING_HALF = os.getenv("EMBEDDING_HALF", "1") == "1"
+# Set to "1" to torch.compile the transformer for the torch backend (needs torch >= 2.1).
+# Compilation adds a one-off warm-up, so it only pays off on larger ingests.
+EMBEDDING_COMPILE = os.getenv("EMBEDDING_COMPILE", "0") == "1"
 
-def clean_list_string(s):
-    if pd.isna(s):
-        return []
+def read_ingest_csv(path):
+    """Read the columns ingest needs from one of the data CSVs."""
+    # The C engine is kept on purpose: the pyarrow engine can't parse the
+    # multi-line abstracts in the papers CSV and turns start times into timestamps.
+    # Text columns are still stored Arrow-backed so the NaN handling and string
+    # ops below run on contiguous buffers instead of Python str objects.
+    text_dtypes = {c: "string[pyarrow]" for c in INGEST_COLUMNS if c != 'avg_rating'}
+    return pd.read_csv(path, usecols=lambda c: c in INGEST_COLUMNS, dtype=text_dtypes)
+
+def join_unique_parts(df, col):
+    """Map each title to the '; '-joined sorted unique ';'-separated values of col."""
+    parts = df[['title', col]].dropna(subset=[col])
+    parts = parts.assign(**{col: parts[col].astype(str).str.split(';')}).explode(col)
+    parts[col] = parts[col].str.strip()
+    parts = parts[parts[col] != ""].drop_duplicates().sort_values(col)
+    return parts.groupby('title')[col].agg('; '.join)
+
+def quantization_drift(fp32_model, int8_model):
+    """Largest cosine distance between fp32 and int8 embeddings of QUANTIZE_CHECK_SAMPLE."""
+    reference = fp32_model.encode(QUANTIZE_CHECK_SAMPLE, convert_to_numpy=True, normalize_embeddings=True)
+    quantized = int8_model.encode(QUANTIZE_CHECK_SAMPLE, convert_to_numpy=True, normalize_embeddings=True)
+    return float(np.max(1 - np.sum(reference * quantized, axis=1)))
+
+# Loaded models by device, so repeated in-process ingests (see /admin/reingest)
+# don't reload the model
+_embedding_models = {}
+
+def load_embedding_model(device):
+    """Load the ingest embedding model on the configured backend."""
+    if device in _embedding_models:
+        return _embedding_models[device]
+    if EMBEDDING_BACKEND == "onnx":
+        model_kwargs = {"file_name": ONNX_MODEL_FILE} if ONNX_MODEL_FILE else None
+        model = SentenceTransformer(MODEL_NAME, device=device, backend="onnx", model_kwargs=model_kwargs)
+    else:
+        model = SentenceTransformer(MODEL_NAME, device=device)
+        if EMBEDDING_HALF and device == 'cuda':
+            model.half()
+        if EMBEDDING_QUANTIZE and device == 'cpu':
+            torch.set_num_threads(os.cpu_count())
+            quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            drift = quantization_drift(model, quantized)
+            if drift <= QUANTIZE_TOLERANCE:
+                print(f"int8 embeddings within {drift:.2e} cosine distance of fp32; using quantized model")
+                model = quantized
+            else:
+                print(f"int8 embeddings drift {drift:.2e} from fp32 (tolerance {QUANTIZE_TOLERANCE:g}); encoding in fp32")
+        elif EMBEDDING_COMPILE:
+            eager_model = model[0].auto_model
+            try:
+                # dynamic=True avoids recompiling for every padded sequence length
+                model[0].auto_model = torch.compile(eager_model, dynamic=True)
+                # Compilation is lazy; run one encode so toolchain/Dynamo errors surface here
+                model.encode(["warmup"])
+            except Exception as e:
+                model[0].auto_model = eager_model
+                print(f"torch.compile unavailable, encoding uncompiled: {e}")
+    _embedding_models[device] = model
+    return model
+
+def encode_batches(model, documents, device, batch_size):
+    """
+    Yield (start, end, embeddings) for consecutive batch_size slices of documents,
+    fanning out over EMBEDDING_PROCESSES workers on CPU.
+    """
+    pool = None
+    if device == 'cpu' and EMBEDDING_PROCESSES > 1:
+        # One intra-op thread per worker so the processes don't oversubscribe cores;
+        # workers are spawned fresh and pick this up when they import torch.
+        # Only set while they start: ingest can run inside the API server, whose
+        # later child processes (e.g. the PDF pool in rag) must not inherit it.
+        previous = os.environ.get("OMP_NUM_THREADS")
+        os.environ["OMP_NUM_THREADS"] = "1"
+        try:
+            pool = model.start_multi_process_pool(target_devices=['cpu'] * EMBEDDING_PROCESSES)
+        finally:
+            if previous is None:
+                del os.environ["OMP_NUM_THREADS"]
+            else:
+                os.environ["OMP_NUM_THREADS"] = previous
     try:
-        # Some fields might be semicolon separated or actual lists
-        if ';' in str(s):
-            return [x.strip() for x in str(s).split(';')]
-        return [x.strip() for x in str(s).split(',')]
-    except:
-        return []
-
-def main():
-    print(f"Loading data from {CSV_PATH}...")
-    df = pd.read_csv(CSV_PATH)
+        for start in range(0, len(documents), batch_size):
+            end = min(start + batch_size, len(documents))
+            if pool is not None:
+                embeddings = model.encode_multi_process(documents[start:end], pool, batch_size=64, chunk_size=1000)
+            else:
+                embeddings = model.encode(
+                    documents[start:end],
+                    batch_size=256 if device == 'cuda' else 128,
+                    show_progress_bar=True,
+                    convert_to_numpy=True,
+                )
+            if embeddings.dtype != np.float32:
+                # fp16 output: store float32 and re-normalize after the cast so
+                # distances stay comparable with fp32 query embeddings
+                embeddings = embeddings.astype(np.float32)
+                embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+            yield start, end, embeddings
+    finally:
+        if pool is not None:
+            model.stop_multi_process_pool(pool)
+
+def main(full_rebuild=None, progress_cb=None):
+    """
+    Ingest the data CSVs into ChromaDB.
+    Only new or changed rows are embedded unless full_rebuild is set (or
+    --full is passed on the command line), which recreates the collection.
+    Progress messages go to progress_cb if given, otherwise they are printed.
+    """
+    if full_rebuild is None:
+        full_rebuild = "--full" in sys.argv[1:]
+    log = progress_cb or print
+
+    log(f"Loading data from {CSV_PATH}...")
+    df = read_ingest_csv(CSV_PATH)
     
     if os.path.exists(EVENTS_CSV_PATH):
-        print(f"Loading events from {EVENTS_CSV_PATH}...")
-        df_events = pd.read_csv(EVENTS_CSV_PATH)
-        print(f"Loaded {len(df_events)} events.")
+        log(f"Loading events from {EVENTS_CSV_PATH}...")
+        df_events = read_ingest_csv(EVENTS_CSV_PATH)
+        log(f"Loaded {len(df_events)} events.")
         df = pd.concat([df, df_events], ignore_index=True)
     
     if os.path.exists(EXPO_CSV_PATH):
-        print(f"Loading expo events from {EXPO_CSV_PATH}...")
-        df_expo = pd.read_csv(EXPO_CSV_PATH)
-        print(f"Loaded {len(df_expo)} expo events.")
+        log(f"Loading expo events from {EXPO_CSV_PATH}...")
+        df_expo = read_ingest_csv(EXPO_CSV_PATH)
+        log(f"Loaded {len(df_expo)} expo events.")
         df = pd.concat([df, df_expo], ignore_index=True)
 
+    # Precompute the /filters vocabularies from the full CSV data so the API
+    # doesn't have to re-read and split the CSVs on startup
+    write_filters(build_filters(df))
+    log(f"Wrote filter vocabularies to {FILTERS_PATH}")
+
     # Filter: keep only San Diego events (exclude Mexico City)
     before_count = len(df)
     # Drop any row whose session mentions Mexico or whose start date is 2025-12-01 (Mexico day)
@@ -49,7 +201,7 @@ def main():
         df = df[~df['neurips_starttime'].astype(str).str.startswith('2025-12-01')]
     after_count = len(df)
     removed = before_count - after_count
-    print(f"Filtered out {removed} Mexico City rows; {after_count} remain (San Diego only).")
+    log(f"Filtered out {removed} Mexico City rows; {after_count} remain (San Diego only).")
     
     # Fill missing abstracts with empty string to include events without abstracts
     df['neurips_abstract'] = df['neurips_abstract'].fillna("")
@@ -59,137 +211,208 @@ def main():
     
     # Aggregate duplicate papers (same title)
     # We want to collect all sessions and affiliations for the same paper
-    print("Aggregating duplicate papers...")
-    aggregation_functions = {
-        'authors': 'first',
-        'neurips_abstract': 'first',
-        'neurips_paper_url': 'first',
-        'neurips_virtualsite_url': 'first',
-        'openreview_urls': 'first',
-        'neurips_starttime': 'first',
-        'neurips_event_type': 'first',
-        'neurips_poster_position': 'first',
-        'avg_rating': 'first',
-        'affiliation': lambda x: '; '.join(sorted(set([i.strip() for s in x.dropna() for i in str(s).split(';') if i.strip()]))),
-        'neurips_session': lambda x: '; '.join(sorted(set([i.strip() for s in x.dropna() for i in str(s).split(';') if i.strip()])))
-    }
+    log("Aggregating duplicate papers...")
+    first_columns = [
+        'authors',
+        'neurips_abstract',
+        'neurips_paper_url',
+        'neurips_virtualsite_url',
+        'openreview_urls',
+        'neurips_starttime',
+        'neurips_event_type',
+        'neurips_poster_position',
+        'avg_rating',
+    ]
     # Keep other columns if needed, but we mainly use these.
     # We need to make sure we don't lose data.
-    
-    df_grouped = df.groupby('title', as_index=False).agg(aggregation_functions)
-    print(f"Found {len(df_grouped)} unique papers after aggregation (from {len(df)} rows).")
+    # groupby().first() is a single Cython pass that takes the first non-null
+    # value per column; drop_duplicates(keep='first') would be cheaper but
+    # takes the whole first row and loses e.g. poster positions that only
+    # appear on a later duplicate.
+    df_grouped = df.groupby('title', as_index=False)[first_columns].first()
+    # Affiliations and sessions are merged separately as the sorted set of
+    # their ';'-separated parts, via explode + drop_duplicates rather than a
+    # Python lambda per group.
+    for col in ['affiliation', 'neurips_session']:
+        df_grouped[col] = df_grouped['title'].map(join_unique_parts(df, col)).fillna("")
+    log(f"Found {len(df_grouped)} unique papers after aggregation (from {len(df)} rows).")
     df = df_grouped
 
 
     # Initialize ChromaDB
-    print("Initializing ChromaDB...")
+    log("Initializing ChromaDB...")
     client = chromadb.PersistentClient(path=CHROMA_PATH)
     
-    # Use SentenceTransformer for embeddings
-    # We can use Chroma's built-in or custom. Let's use custom to be sure of the model.
-    # Actually, Chroma's default is all-MiniLM-L6-v2, but let's be explicit.
-    sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=MODEL_NAME)
+    if full_rebuild:
+        try:
+            client.delete_collection(name=COLLECTION_NAME)
+            log(f"Deleted existing collection {COLLECTION_NAME}")
+        except Exception:
+            pass
     
     try:
-        client.delete_collection(name=COLLECTION_NAME)
-        print(f"Deleted existing collection {COLLECTION_NAME}")
+        # No embedding function: documents are embedded by us below (with
+        # load_embedding_model), and backend/rag.py embeds queries itself
+        collection = client.get_collection(name=COLLECTION_NAME, embedding_function=None)
     except Exception:
-        pass
-    
-    collection = client.create_collection(name=COLLECTION_NAME, embedding_function=sentence_transformer_ef)
+        # HNSW settings can only be set at creation time
+        collection = client.create_collection(
+            name=COLLECTION_NAME,
+            embedding_function=None,
+            metadata=HNSW_METADATA,
+        )
 
     # Prepare data for insertion
-    documents = []
-    metadatas = []
-    ids = []
-
-    print("Processing papers...")
-    for idx, row in df.iterrows():
-        # Create a rich text representation for embedding
-        # Title + Abstract + Event Type is usually best
-        event_type = str(row['neurips_event_type']) if not pd.isna(row['neurips_event_type']) else ""
-        
-        # Use title as abstract if abstract is missing
-        abstract_text = row['neurips_abstract']
-        if not abstract_text:
-            abstract_text = row['title']
-            
-        text_to_embed = f"Title: {row['title']}\nType: {event_type}\nAbstract: {abstract_text}"
-        
-        # Derive day and ampm separately from start time if available
-        start_time_val = str(row['neurips_starttime']) if 'neurips_starttime' in row else ""
-        day = ""
-        ampm = ""
-        try:
-            if start_time_val and start_time_val != 'nan' and 'T' in start_time_val:
-                date_part, time_part = start_time_val.split('T', 1)
-                hour_str = time_part.split(':')[0]
-                hour = int(hour_str) if hour_str.isdigit() else 0
-                day = date_part  # Store as YYYY-MM-DD
-                ampm = 'AM' if hour < 12 else 'PM'
-        except Exception:
-            day = ""
-            ampm = ""
-
-        # Prepare metadata
-        # Chroma metadata must be int, float, str, or bool. No lists.
-        # We'll join lists into strings.
-        
-        # Get poster position if available
-        poster_position = ""
-        if 'neurips_poster_position' in row:
-            pos_val = row['neurips_poster_position']
-            if not pd.isna(pos_val) and str(pos_val).strip() not in ['', 'nan', 'None']:
-                poster_position = str(pos_val)
-        
-        # Get rating if available
-        rating = 0.0
-        if 'avg_rating' in row:
-            rating_val = row['avg_rating']
-            if not pd.isna(rating_val):
-                try:
-                    rating = float(rating_val)
-                except (ValueError, TypeError):
-                    rating = 0.0
-        
-        meta = {
-            "title": str(row['title']),
-            "authors": str(row['authors']),
-            "affiliation": str(row['affiliation']),
-            "session": str(row['neurips_session']) if not pd.isna(row['neurips_session']) else "",
-            "event_type": event_type,
-            "year": 2025,
-            "paper_url": str(row['neurips_paper_url']) if not pd.isna(row['neurips_paper_url']) else "",
-            "neurips_virtualsite_url": str(row['neurips_virtualsite_url']) if not pd.isna(row['neurips_virtualsite_url']) else "",
-            "openreview_url": str(row['openreview_urls']) if not pd.isna(row['openreview_urls']) else "",
-            "start_time": str(row['neurips_starttime']) if not pd.isna(row['neurips_starttime']) else "",
-            "day": day,
-            "ampm": ampm,
-            "poster_position": poster_position,
-            "rating": rating
-        }
-        
-        documents.append(text_to_embed)
-        metadatas.append(meta)
-        ids.append(str(idx))
-
-    # Insert in batches to avoid hitting limits
-    BATCH_SIZE = 100
-    total_batches = len(documents) // BATCH_SIZE + 1
+    # Everything below is built with column-wise pandas ops rather than a
+    # per-row loop; iterrows() dominated pre-insert time on the full dataset.
+    log("Processing papers...")
+
+    def text_col(col):
+        # Chroma metadata values can't be NaN; missing text becomes "".
+        # The astype is a no-op for columns that are already Arrow strings.
+        return df[col].astype("string[pyarrow]").fillna("")
+
+    title = text_col('title')
+    event_type = text_col('neurips_event_type')
+    start_time = text_col('neurips_starttime')
+
+    # Use title as abstract if abstract is missing
+    abstract = text_col('neurips_abstract')
+    abstract_text = abstract.where(abstract != "", title)
+
+    # Create a rich text representation for embedding
+    # Title + Abstract + Event Type is usually best
+    documents = ("Title: " + title + "\nType: " + event_type + "\nAbstract: " + abstract_text).tolist()
+
+    # Derive day (YYYY-MM-DD) and ampm separately from start time if available
+    parts = start_time.str.split('T', n=1, expand=True).reindex(columns=[0, 1])
+    has_time = parts[1].notna()
+    hour = pd.to_numeric(parts[1].str.split(':', n=1).str[0], errors='coerce').fillna(0)
+    day = parts[0].where(has_time, "")
+    ampm = pd.Series(np.where(hour < 12, 'AM', 'PM'), index=df.index).where(has_time, "")
+
+    # Get poster position if available
+    poster_position = text_col('neurips_poster_position')
+    poster_position = poster_position.where(~poster_position.str.strip().isin(['', 'nan', 'None']), "")
+
+    # Get rating if available
+    rating = pd.to_numeric(df['avg_rating'], errors='coerce').fillna(0.0).astype(float)
+
+    meta_df = pd.DataFrame({
+        "title": title,
+        # Same abstract text as in the document, so search never parses it out
+        "abstract": abstract_text,
+        "authors": text_col('authors'),
+        "affiliation": text_col('affiliation'),
+        "session": text_col('neurips_session'),
+        "event_type": event_type,
+        "year": 2025,
+        "paper_url": text_col('neurips_paper_url'),
+        "neurips_virtualsite_url": text_col('neurips_virtualsite_url'),
+        "openreview_url": text_col('openreview_urls'),
+        "start_time": start_time,
+        "day": day,
+        "ampm": ampm,
+        "poster_position": poster_position,
+        "rating": rating,
+    })
+    # Lower-cased affiliation/author/session tokens (split like the filter
+    # vocabularies) stored as list metadata, so search filters them in Chroma
+    # with $contains instead of scanning joined strings in Python
+    def token_lists(col):
+        parts = (
+            text_col(col).str.lower()
+            .str.replace(';', ',', regex=False)
+            .str.split(',')
+            .explode()
+            .str.strip()
+        )
+        parts = parts[parts != ""]
+        # De-duplicate tokens within a row, not across rows
+        pairs = pd.DataFrame({"row": parts.index, "token": parts.to_numpy()}).drop_duplicates()
+        return pairs.groupby("row")["token"].agg(list).reindex(df.index)
+
+    tokens = {
+        "affiliation_tokens": token_lists('affiliation'),
+        "author_tokens": token_lists('authors'),
+        "session_tokens": token_lists('neurips_session'),
+    }
+
+    # Fingerprint each row (document text + metadata) so a re-run only
+    # re-embeds rows that are new or changed since the last ingest
+    content_hash = pd.util.hash_pandas_object(
+        meta_df.assign(document=documents, **{k: v.str.join('|') for k, v in tokens.items()}),
+        index=False,
+    )
+    meta_df["content_hash"] = content_hash.map('{:016x}'.format)
+    metadatas = meta_df.to_dict('records')
+    # Chroma rejects empty lists, so rows without tokens just omit the key
+    for key, lists in tokens.items():
+        for metadata, values in zip(metadatas, lists.tolist()):
+            if isinstance(values, list):
+                metadata[key] = values
+    # Ids come from the title (the dedup key) rather than the row position, so
+    # adding or removing a paper doesn't shift the id of every row after it
+    ids = [hashlib.sha1(t.encode("utf-8")).hexdigest()[:16] for t in title.tolist()]
+
+    existing = collection.get(include=['metadatas'])
+    existing_hashes = {
+        id_: (meta or {}).get("content_hash")
+        for id_, meta in zip(existing['ids'], existing['metadatas'])
+    }
+    id_set = set(ids)
+    removed = [id_ for id_ in existing_hashes if id_ not in id_set]
+    changed = [i for i, id_ in enumerate(ids) if existing_hashes.get(id_) != metadatas[i]["content_hash"]]
+    log(f"{len(changed)} new or changed, {len(ids) - len(changed)} unchanged, {len(removed)} removed.")
+
+    BATCH_SIZE = client.get_max_batch_size()
+    for i in range(0, len(removed), BATCH_SIZE):
+        collection.delete(ids=removed[i:i + BATCH_SIZE])
+
+    documents = [documents[i] for i in changed]
+    metadatas = [metadatas[i] for i in changed]
+    ids = [ids[i] for i in changed]
+    if not ids:
+        log("Collection is up to date, nothing to embed.")
+        log("Ingestion complete!")
+        return
+
+    # Embed outside Chroma instead of letting it run the embedding function on
+    # each add() batch. Documents are encoded one insert batch at a time and
+    # each batch is upserted on a background thread while the next one encodes,
+    # so only one batch of embeddings is held at once and insert latency hides
+    # behind encoding. encode() sorts its input by length before batching (and
+    # restores the original order afterwards); insert batches are thousands of
+    # documents, so keep them large or that padding saving is lost.
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    log(f"Encoding {len(documents)} documents on {device} ({EMBEDDING_BACKEND})...")
+    model = load_embedding_model(device)
+
+    # Add cost is mostly per-call overhead (validation, one SQLite transaction
+    # each); use the largest batch Chroma accepts.
+    total_batches = -(-len(documents) // BATCH_SIZE)
     
-    print(f"Inserting {len(documents)} documents in {total_batches} batches...")
+    log(f"Inserting {len(documents)} documents in {total_batches} batches...")
     
-    for i in range(0, len(documents), BATCH_SIZE):
-        batch_end = min(i + BATCH_SIZE, len(documents))
-        print(f"Batch {i // BATCH_SIZE + 1}/{total_batches}")
-        
-        collection.add(
-            documents=documents[i:batch_end],
-            metadatas=metadatas[i:batch_end],
-            ids=ids[i:batch_end]
-        )
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = None
+        for start, end, embeddings in encode_batches(model, documents, device, BATCH_SIZE):
+            if pending is not None:
+                pending.result()
+            log(f"Batch {start // BATCH_SIZE + 1}/{total_batches}")
+            
+            # upsert: changed rows keep their id and replace the stored version
+            pending = executor.submit(
+                collection.upsert,
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                ids=ids[start:end],
+                embeddings=embeddings.tolist()
+            )
+        if pending is not None:
+            pending.result()
 
-    print("Ingestion complete!")
+    log("Ingestion complete!")
 
 if __name__ == "__main__":
     main()
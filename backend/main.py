@@ -1,16 +1,30 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, field_validator
 from typing import Optional, List, Union, Any
 import uvicorn
+import anyio
 import os
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
 from backend import rag
 
 load_dotenv()
 
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="NeuriScout - NeurIPS 2025 Paper Explorer")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the Chroma collection once at startup so the first search and the
+    # admin status endpoints don't pay the cold-open cost
+    try:
+        rag.get_collection()
+    except RuntimeError as e:
+        print(f"ChromaDB collection not loaded at startup: {e}")
+    yield
+    await rag.close_http_client()
+
+app = FastAPI(title="NeuriScout - NeurIPS 2025 Paper Explorer", lifespan=lifespan)
 
 # Get allowed origins from environment variable
 # For development: "http://localhost:3000"
@@ -65,6 +79,28 @@ class ChatRequest(BaseModel):
     openai_model: Optional[str] = None
     system_prompt: Optional[str] = None
 
+async def _answer_from_paper_texts(request: ChatRequest):
+    # For OpenAI, fetch and extract text (with truncation)
+    urls = [p.url for p in request.papers]
+    texts = await rag.fetch_multiple_papers(urls, max_chars=rag.CONTEXT_MAX_CHARS.get(request.model))
+    
+    # Combine texts with titles (one join rather than repeated +=)
+    combined_context = "".join(
+        f"--- Paper: {paper.title} ---\n{text}\n\n"
+        for paper, text in zip(request.papers, texts)
+    )
+    
+    # 2. Answer question
+    return rag.answer_question(
+        combined_context, 
+        request.question, 
+        model=request.model, 
+        api_key=request.api_key,
+        gemini_model=request.gemini_model,
+        openai_model=request.openai_model,
+        system_prompt=request.system_prompt
+    )
+
 @app.post("/chat")
 async def chat(request: ChatRequest):
     # Debug: Log API key status
@@ -84,28 +120,33 @@ async def chat(request: ChatRequest):
         )
         return {"answer": answer}
     
-    # For OpenAI, fetch and extract text (with truncation)
-    urls = [p.url for p in request.papers]
-    texts = await rag.fetch_multiple_papers(urls)
-    
-    # Combine texts with titles
-    combined_context = ""
-    for i, text in enumerate(texts):
-        combined_context += f"--- Paper: {request.papers[i].title} ---\n{text}\n\n"
-    
-    # 2. Answer question
-    answer = rag.answer_question(
-        combined_context, 
-        request.question, 
-        model=request.model, 
-        api_key=request.api_key,
-        gemini_model=request.gemini_model,
-        openai_model=request.openai_model,
-        system_prompt=request.system_prompt
-    )
-    
+    answer = await _answer_from_paper_texts(request)
     return {"answer": answer}
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Same as /chat, but streams the answer as plain text: Gemini answers arrive
+    token by token after the upload status, OpenAI answers in one piece.
+    """
+    print(f"[DEBUG] Received streaming chat request - API key provided: {request.api_key is not None}, Model: {request.model}")
+    
+    if request.model == "gemini":
+        paper_urls = [(p.title, p.url) for p in request.papers]
+        stream = rag.stream_answer_question_with_urls(
+            paper_urls,
+            request.question,
+            model=request.model,
+            api_key=request.api_key,
+            gemini_model=request.gemini_model,
+            system_prompt=request.system_prompt
+        )
+    else:
+        async def stream():
+            yield await _answer_from_paper_texts(request)
+        stream = stream()
+    return StreamingResponse(stream, media_type="text/plain; charset=utf-8")
+
 @app.post("/search")
 def search(request: SearchRequest):
     filters = {}
@@ -137,8 +178,7 @@ class GeminiModelsRequest(BaseModel):
 @app.post("/gemini-models")
 def get_gemini_models(request: GeminiModelsRequest):
     try:
-        import google.generativeai as genai
-        genai.configure(api_key=request.api_key)
+        genai = rag.get_genai(request.api_key)
         
         models = []
         for model in genai.list_models():
@@ -182,15 +222,37 @@ def get_openai_models(request: OpenAIModelsRequest):
         return {'error': str(e), 'models': []}
 
 @app.post("/admin/reingest")
-async def trigger_reingest():
+async def trigger_reingest(isolated: bool = False):
     """
-    Trigger a re-ingestion of papers into ChromaDB.
-    WARNING: This will delete existing data and re-ingest from CSV files.
+    Trigger a re-ingestion of papers into ChromaDB from the CSV files.
+    Only new or changed rows are re-embedded; rows no longer in the CSVs are removed.
+    Runs in a worker thread of this process by default, reusing already-imported
+    libraries; pass ?isolated=true to run it in a separate Python process instead.
     """
     import subprocess
     import sys
     import os
     
+    if not isolated:
+        from backend import ingest
+        import traceback
+
+        lines = []
+        try:
+            await anyio.to_thread.run_sync(lambda: ingest.main(full_rebuild=False, progress_cb=lines.append))
+            success, stderr = True, ""
+        except Exception:
+            success, stderr = False, traceback.format_exc()
+        # Pick up the refreshed collection and filters on the next request
+        rag.reset_caches()
+        return {
+            "success": success,
+            "stdout": "\n".join(str(line) for line in lines),
+            "stderr": stderr,
+            "returncode": 0 if success else 1,
+            "message": "Ingest completed" if success else "Ingest failed"
+        }
+    
     try:
         # Get the base directory
         base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -204,6 +266,7 @@ async def trigger_reingest():
             cwd=base_dir,
             env={**os.environ, "PYTHONUNBUFFERED": "1"}
         )
+        rag.reset_caches()
         
         return {
             "success": result.returncode == 0,
@@ -250,9 +313,7 @@ def ingest_status(lines: int = 200):
     """
     Return the last N lines of the ingest log and whether the collection exists.
     """
-    import os
     from pathlib import Path
-    import chromadb
     base_dir = Path(__file__).parent.parent
     log_path = base_dir / "ingest.log"
 
@@ -266,12 +327,10 @@ def ingest_status(lines: int = 200):
         except Exception as e:
             log_tail = f"<error reading log: {e}>"
 
-    # Check collection
-    chroma_path = os.getenv("CHROMA_DB_PATH", str(base_dir / "chroma_db"))
+    # Check collection (reuses the process-wide client from backend.rag)
     status = {"log_path": str(log_path), "log_tail": log_tail, "collection": {}}
     try:
-        client = chromadb.PersistentClient(path=chroma_path)
-        collection = client.get_collection('neurips_papers')
+        collection = rag.get_collection()
         status["collection"] = {"exists": True, "count": collection.count()}
     except Exception as e:
         status["collection"] = {"exists": False, "error": str(e)}
@@ -281,13 +340,12 @@ def ingest_status(lines: int = 200):
 @app.get("/admin/status")
 def get_status():
     """Check the status of ChromaDB and data files."""
-    import os
     from pathlib import Path
     
     base_dir = Path(__file__).parent.parent
     status = {
         "base_dir": str(base_dir),
-        "chroma_path": os.getenv("CHROMA_DB_PATH", str(base_dir / "chroma_db")),
+        "chroma_path": rag.CHROMA_PATH,
         "data_files": {},
         "collection_status": None
     }
@@ -305,11 +363,9 @@ def get_status():
             "size_mb": round(csv_path.stat().st_size / 1024 / 1024, 2) if csv_path.exists() else None
         }
     
-    # Check collection
+    # Check collection (reuses the process-wide client from backend.rag)
     try:
-        import chromadb
-        client = chromadb.PersistentClient(path=status["chroma_path"])
-        collection = client.get_collection('neurips_papers')
+        collection = rag.get_collection()
         status["collection_status"] = {
             "exists": True,
             "count": collection.count()
@@ -0,0 +1,37 @@
+import pypdfium2 as pdfium
+
+def count_pdf_pages(pdf_bytes: bytes):
+    """Returns the number of pages in a PDF (only the page tree is read)."""
+    pdf = pdfium.PdfDocument(pdf_bytes)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+def extract_pdf_text(pdf_bytes: bytes, start: int = 0, stop: int = None, max_chars: int = None):
+    """
+    Extracts the text of pages [start, stop) of a PDF (all pages by default),
+    each page followed by a newline. With max_chars, stops after the first page
+    that brings the text to at least max_chars characters.
+    Kept in its own module so process-pool workers can import it without
+    loading the Chroma client and embedding model from backend.rag.
+    """
+    # pypdfium2 wraps PDFium (C++), much faster than a pure-Python parser
+    pdf = pdfium.PdfDocument(pdf_bytes)
+    try:
+        n_pages = len(pdf)
+        stop = n_pages if stop is None else min(stop, n_pages)
+        pages = []
+        total = 0
+        for index in range(start, stop):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_range() + "\n")
+            textpage.close()
+            page.close()
+            total += len(pages[-1])
+            if max_chars is not None and total >= max_chars:
+                break
+        return "".join(pages)
+    finally:
+        pdf.close()
@@ -2,20 +2,57 @@ import chromadb
 from chromadb.utils import embedding_functions
 from sentence_transformers import SentenceTransformer
 import httpx
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
 from bs4 import BeautifulSoup
 import io
-import pypdf
 import os
+import platform
+import re
+import threading
+import time
 from pathlib import Path
+from datetime import datetime
+from functools import lru_cache
+from collections import OrderedDict
 
 # Configuration
 CHROMA_PATH = os.getenv("CHROMA_DB_PATH", str(Path(__file__).parent.parent / "chroma_db"))
 COLLECTION_NAME = "neurips_papers"
 MODEL_NAME = "all-MiniLM-L6-v2"
+# Query embedding backend: "torch" (default) or "onnx" to embed search queries
+# with ONNX Runtime, which needs the optional extra: pip install -e ".[onnx]"
+QUERY_EMBEDDING_BACKEND = os.getenv("QUERY_EMBEDDING_BACKEND", "torch")
+def _default_query_onnx_file():
+    """Pick the model repo's 8-bit ONNX export that matches this CPU's vector extensions."""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        flags = ""
+    if "avx512_vnni" in flags:
+        return "onnx/model_qint8_avx512_vnni.onnx"
+    if "avx512" in flags:
+        return "onnx/model_qint8_avx512.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+# ONNX graph used for queries. Defaults to the 8-bit quantized export for this
+# CPU; its vectors differ from the fp32 document vectors only by quantization
+# noise, which doesn't move cosine rankings in practice.
+QUERY_ONNX_MODEL_FILE = os.getenv("QUERY_ONNX_MODEL_FILE") or _default_query_onnx_file()
 
 # Initialize ChromaDB Client (Global)
 client = chromadb.PersistentClient(path=CHROMA_PATH)
-sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=MODEL_NAME)
+if QUERY_EMBEDDING_BACKEND == "onnx":
+    sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
+        model_name=MODEL_NAME, backend="onnx", model_kwargs={"file_name": QUERY_ONNX_MODEL_FILE}
+    )
+else:
+    sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=MODEL_NAME)
 
 # Cached collection reference
 _collection_cache = None
@@ -30,316 +67,599 @@ def get_collection():
             raise RuntimeError(f"ChromaDB collection '{COLLECTION_NAME}' not found. Run 'python -m backend.ingest' to create it. Error: {e}")
     return _collection_cache
 
+def reset_caches():
+    """Drop the cached collection, filters and search results so they are reloaded on next use (e.g. after ingest)."""
+    global _collection_cache, _filters_cache, _wildcard_snapshot
+    _collection_cache = None
+    _filters_cache = None
+    _wildcard_snapshot = None
+    with _search_cache_lock:
+        _search_cache.clear()
+
+@lru_cache(maxsize=1024)
+def _embed_query(query: str):
+    """
+    Embed a query string with the collection's embedding function.
+    Cached so repeated queries (re-filtering, paging) skip the model forward pass;
+    returned as a tuple to keep it hashable and immutable.
+    """
+    return tuple(float(x) for x in sentence_transformer_ef([query])[0])
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+# Search filter name -> token list metadata field written by ingest
+TOKEN_FILTERS = (('affiliation', 'affiliation_tokens'), ('author', 'author_tokens'), ('session', 'session_tokens'))
+
+def _token_filter_values(filters: dict, key: str):
+    return [value.strip().lower() for value in _as_list(filters.get(key) or []) if value.strip()]
+
+def _build_where(filters: dict):
+    """
+    Build a Chroma `where` clause for all search filters.
+    Returns None when there is nothing to push down.
+    """
+    if not filters:
+        return None
+    conditions = []
+
+    # Day (OR logic if list). A day may carry an AM/PM suffix, e.g. "2025-12-03 PM".
+    if filters.get('day'):
+        day_conditions = []
+        for day in _as_list(filters['day']):
+            if day.endswith(' AM') or day.endswith(' PM'):
+                date_part, half = day.rsplit(' ', 1)
+                day_conditions.append({"$and": [{"day": date_part}, {"ampm": half}]})
+            else:
+                day_conditions.append({"day": day})
+        conditions.append(day_conditions[0] if len(day_conditions) == 1 else {"$or": day_conditions})
+
+    if filters.get('ampm'):
+        conditions.append({"ampm": filters['ampm']})
+
+    # Affiliation/author/session (OR logic if list) match the lower-cased
+    # tokens that ingest stores as list metadata, e.g. ["mit", "harvard"]
+    for key, field in TOKEN_FILTERS:
+        token_conditions = [{field: {"$contains": value}} for value in _token_filter_values(filters, key)]
+        if token_conditions:
+            conditions.append(token_conditions[0] if len(token_conditions) == 1 else {"$or": token_conditions})
+
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+def _format_result(id_: str, metadata: dict, distance: float):
+    return {
+        "id": id_,
+        "title": metadata['title'],
+        # Stored by ingest, so the document text never needs parsing here
+        "abstract": metadata.get('abstract', ''),
+        "authors": metadata['authors'],
+        "affiliation": metadata['affiliation'],
+        "session": metadata['session'],
+        "paper_url": metadata['paper_url'],
+        "neurips_virtualsite_url": metadata.get('neurips_virtualsite_url', ''),
+        "openreview_url": metadata['openreview_url'],
+        "start_time": metadata.get('start_time', ''),
+        "day": metadata.get('day', ''),
+        "ampm": metadata.get('ampm', ''),
+        "poster_position": metadata.get('poster_position', ''),
+        "rating": metadata.get('rating', 0.0),
+        "distance": distance
+    }
+
+# Formatted search results keyed by (query, n_results, filters, threshold).
+# LRU with a TTL as well, since an out-of-process ingest can't clear it.
+SEARCH_CACHE_SIZE = 2048
+SEARCH_CACHE_TTL = 600
+_search_cache = OrderedDict()  # key -> (cached_at, results)
+_search_cache_lock = threading.Lock()
+
+def _search_cache_key(query: str, n_results: int, filters: dict, threshold: float):
+    if not query or query.strip() == "*":
+        query = "*"
+    normalized_filters = tuple(sorted((key, tuple(_as_list(value))) for key, value in (filters or {}).items() if value))
+    return (query, n_results, normalized_filters, threshold)
+
 def search_papers(query: str, n_results: int = 10, filters: dict = None, threshold: float = None):
     """
     Search for papers using semantic search and metadata filters.
+    Repeated searches are served from an in-memory result cache.
     """
-    collection = get_collection()
+    key = _search_cache_key(query, n_results, filters, threshold)
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] <= SEARCH_CACHE_TTL:
+            _search_cache.move_to_end(key)
+            return list(entry[1])
     
-    where_clause = {}
-    if filters:
-        # ChromaDB 'where' clause supports $and, $or, etc.
-        # Simple implementation: exact match for provided keys
-        # Note: Ingested metadata strings might need partial match, but Chroma only supports exact or $in
-        # For this MVP, we'll assume exact match or handle filtering post-retrieval if needed.
-        # But wait, our metadata are strings like "MIT; Harvard". Exact match won't work well for "MIT".
-        # Chroma doesn't support "contains" for strings in the `where` clause natively in all versions.
-        # We might need to fetch more results and filter in Python if complex filtering is needed.
-        # Let's try to use basic filtering if provided.
-        pass
-        
-    # We will fetch more results and filter in python for "contains" logic if needed, 
-    # but for now let's just do semantic search.
+    results = _search_papers(query, n_results, filters, threshold)
+    with _search_cache_lock:
+        _search_cache[key] = (time.monotonic(), results)
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+    return list(results)
+
+# In-memory snapshot of every row's filterable metadata for wildcard searches,
+# which are pure metadata filtering and never need the vector index. Rebuilt
+# after reset_caches() or once it is SEARCH_CACHE_TTL old.
+_wildcard_snapshot = None  # (built_at, frame, token_index, ids, metadatas)
+_wildcard_snapshot_lock = threading.Lock()
+
+def _get_wildcard_snapshot():
+    global _wildcard_snapshot
+    with _wildcard_snapshot_lock:
+        if _wildcard_snapshot is None or time.monotonic() - _wildcard_snapshot[0] > SEARCH_CACHE_TTL:
+            results = get_collection().get(include=['metadatas'])
+            metadatas = results['metadatas']
+            frame = pd.DataFrame({
+                "day": [m.get('day', '') for m in metadatas],
+                "ampm": [m.get('ampm', '') for m in metadatas],
+            }, dtype="string[pyarrow]")
+            # Inverted index per token field: token -> row positions holding it
+            token_index = {}
+            for _, field in TOKEN_FILTERS:
+                postings = {}
+                for row, metadata in enumerate(metadatas):
+                    for token in metadata.get(field) or ():
+                        postings.setdefault(token, []).append(row)
+                token_index[field] = {token: np.array(rows) for token, rows in postings.items()}
+            _wildcard_snapshot = (time.monotonic(), frame, token_index, results['ids'], metadatas)
+        return _wildcard_snapshot[1:]
+
+def _wildcard_mask(frame, token_index: dict, filters: dict):
+    """Vectorized equivalent of _build_where over the wildcard snapshot."""
+    mask = np.ones(len(frame), dtype=bool)
+    if not filters:
+        return mask
+    
+    if filters.get('day'):
+        day_mask = np.zeros(len(frame), dtype=bool)
+        for day in _as_list(filters['day']):
+            if day.endswith(' AM') or day.endswith(' PM'):
+                date_part, half = day.rsplit(' ', 1)
+                day_mask |= ((frame['day'] == date_part) & (frame['ampm'] == half)).to_numpy(dtype=bool)
+            else:
+                day_mask |= (frame['day'] == day).to_numpy(dtype=bool)
+        mask &= day_mask
+    
+    if filters.get('ampm'):
+        mask &= (frame['ampm'] == filters['ampm']).to_numpy(dtype=bool)
     
-    # Handle wildcard or empty query (Metadata filtering only)
+    # Token filters are posting-list lookups rather than scans
+    for key, field in TOKEN_FILTERS:
+        values = _token_filter_values(filters, key)
+        if values:
+            field_mask = np.zeros(len(frame), dtype=bool)
+            for value in values:
+                rows = token_index[field].get(value)
+                if rows is not None:
+                    field_mask[rows] = True
+            mask &= field_mask
+    return mask
+
+def _search_papers(query: str, n_results: int, filters: dict, threshold: float):
+    # Handle wildcard or empty query (Metadata filtering only), served from
+    # the in-memory snapshot
     if not query or query.strip() == "*":
-        # Fetch a large number of results to filter in Python
-        # We DO NOT pass 'where' here because we need "contains" logic which Chroma doesn't support well for strings.
-        results = collection.get(
-            limit=10000  # High limit to cover all items
-        )
+        frame, token_index, ids, metadatas = _get_wildcard_snapshot()
+        rows = np.flatnonzero(_wildcard_mask(frame, token_index, filters))[:n_results]
         
-        formatted_results = []
-        if results['ids']:
-            for i in range(len(results['ids'])):
-                # Apply filters manually with OR logic for arrays
-                metadata = results['metadatas'][i]
-                
-                # Check Affiliation (OR logic if list)
-                if filters and filters.get('affiliation'):
-                    affiliations = filters['affiliation'] if isinstance(filters['affiliation'], list) else [filters['affiliation']]
-                    if not any(aff.lower() in metadata['affiliation'].lower() for aff in affiliations):
-                        continue
-                
-                # Check Author (OR logic if list)
-                if filters and filters.get('author'):
-                    authors = filters['author'] if isinstance(filters['author'], list) else [filters['author']]
-                    if not any(auth.lower() in metadata['authors'].lower() for auth in authors):
-                        continue
-                        
-                # Check Session (OR logic if list)
-                if filters and filters.get('session'):
-                    sessions = filters['session'] if isinstance(filters['session'], list) else [filters['session']]
-                    if not any(sess.lower() in metadata['session'].lower() for sess in sessions):
-                        continue
-                
-                # Check Day filter (OR logic if list)
-                if filters and filters.get('day'):
-                    days = filters['day'] if isinstance(filters['day'], list) else [filters['day']]
-                    item_day = metadata.get('day', '')
-                    if not any(day == item_day for day in days):
-                        continue
-                
-                # Check AM/PM filter
-                if filters and filters.get('ampm'):
-                    item_ampm = metadata.get('ampm', '')
-                    if item_ampm != filters['ampm']:
-                        continue
-
-                formatted_results.append({
-                    "id": results['ids'][i],
-                    "title": metadata['title'],
-                    "abstract": results['documents'][i].split("Abstract: ")[1] if "Abstract: " in results['documents'][i] else "",
-                    "authors": metadata['authors'],
-                    "affiliation": metadata['affiliation'],
-                    "session": metadata['session'],
-                    "paper_url": metadata['paper_url'],
-                    "neurips_virtualsite_url": metadata.get('neurips_virtualsite_url', ''),
-                    "openreview_url": metadata['openreview_url'],
-                    "start_time": metadata.get('start_time', ''),
-                    "day": metadata.get('day', ''),
-                    "ampm": metadata.get('ampm', ''),
-                    "poster_position": metadata.get('poster_position', ''),
-                    "rating": metadata.get('rating', 0.0),
-                    "distance": 0.0
-                })
+        formatted_results = [_format_result(ids[i], metadatas[i], 0.0) for i in rows]
         
         # Apply similarity threshold if provided (distance lower is more similar)
         if threshold is not None:
             formatted_results = [r for r in formatted_results if r.get('distance', 0.0) <= threshold]
         
-        return formatted_results[:n_results]
-
-    # Semantic Search
-    # For semantic search, we also want "contains" logic for filters.
-    # Chroma's `where` is exact match.
-    # So we should NOT pass filters to Chroma, but filter in Python after fetching.
-    results = collection.query(
-        query_texts=[query],
-        n_results=n_results * 5, # Fetch more to allow for filtering
+        return formatted_results
+
+    # Semantic Search. Every filter is stored as exact metadata values at
+    # ingest time, so Chroma applies them and only the requested rows come back
+    results = get_collection().query(
+        query_embeddings=[list(_embed_query(query))],
+        n_results=n_results,
+        where=_build_where(filters),
+        # The abstract is in the metadata; the document text isn't needed
+        include=['metadatas', 'distances'],
     )
     
     # Format results
-    formatted_results = []
-    if results['ids']:
-        for i in range(len(results['ids'][0])):
-            metadata = results['metadatas'][0][i]
-            
-            # Apply filters manually with OR logic for arrays
-            if filters and filters.get('affiliation'):
-                affiliations = filters['affiliation'] if isinstance(filters['affiliation'], list) else [filters['affiliation']]
-                if not any(aff.lower() in metadata['affiliation'].lower() for aff in affiliations):
-                    continue
-            if filters and filters.get('author'):
-                authors = filters['author'] if isinstance(filters['author'], list) else [filters['author']]
-                if not any(auth.lower() in metadata['authors'].lower() for auth in authors):
-                    continue
-            if filters and filters.get('session'):
-                sessions = filters['session'] if isinstance(filters['session'], list) else [filters['session']]
-                if not any(sess.lower() in metadata['session'].lower() for sess in sessions):
-                    continue
-            
-            # Check Day (OR logic if list) - extract date and time from start_time
-            if filters and filters.get('day'):
-                days = filters['day'] if isinstance(filters['day'], list) else [filters['day']]
-                start_time = metadata.get('start_time', '')
-                if start_time and 'T' in start_time:
-                    paper_date = start_time.split('T')[0]  # Extract YYYY-MM-DD
-                    paper_time = start_time.split('T')[1] if 'T' in start_time else ''
-                    paper_hour = int(paper_time.split(':')[0]) if paper_time and ':' in paper_time else 0
-                    
-                    match_found = False
-                    for day in days:
-                        # Check if day filter includes AM/PM
-                        if ' AM' in day or ' PM' in day:
-                            date_part = day.replace(' AM', '').replace(' PM', '')
-                            if date_part in paper_date:
-                                if ' AM' in day and paper_hour < 12:
-                                    match_found = True
-                                    break
-                                elif ' PM' in day and paper_hour >= 12:
-                                    match_found = True
-                                    break
-                        else:
-                            # No AM/PM specified, match any time on that date
-                            if day in paper_date:
-                                match_found = True
-                                break
-                    
-                    if not match_found:
-                        continue
-                else:
-                    continue  # Skip papers without valid start_time
-            
-            distance = results['distances'][0][i] if results['distances'] else 0.0
-            
-            # Apply similarity threshold if provided
-            if threshold is not None and distance > threshold:
-                continue
-
-            formatted_results.append({
-                "id": results['ids'][0][i],
-                "title": metadata['title'],
-                "abstract": results['documents'][0][i].split("Abstract: ")[1] if "Abstract: " in results['documents'][0][i] else "",
-                "authors": metadata['authors'],
-                "affiliation": metadata['affiliation'],
-                "session": metadata['session'],
-                "paper_url": metadata['paper_url'],
-                "neurips_virtualsite_url": metadata.get('neurips_virtualsite_url', ''),
-                "openreview_url": metadata['openreview_url'],
-                "start_time": metadata.get('start_time', ''),
-                "day": metadata.get('day', ''),
-                "ampm": metadata.get('ampm', ''),
-                "poster_position": metadata.get('poster_position', ''),
-                "rating": metadata.get('rating', 0.0),
-                "distance": results['distances'][0][i]
-            })
-            
-    return formatted_results[:n_results]
+    ids = results['ids'][0] if results['ids'] else []
+    metadatas = results['metadatas'][0] if ids else []
+    distances = results['distances'][0] if results['distances'] else [0.0] * len(ids)
+    return [
+        _format_result(id_, metadata, distance)
+        for id_, metadata, distance in zip(ids, metadatas, distances)
+        # Apply similarity threshold if provided
+        if threshold is None or distance <= threshold
+    ]
 
 import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from backend.pdf_text import count_pdf_pages, extract_pdf_text
+from backend.filters import FILTERS_PATH, FILTER_COLUMNS, build_filters, load_filters, write_filters
+
+# OpenReview forum page -> PDF download URL
+_OPENREVIEW_FORUM_RE = re.compile(r'^(https?://(?:www\.)?openreview\.net/)forum\?', re.IGNORECASE)
+
+def to_pdf_url(url: str) -> str:
+    """Map an OpenReview forum URL to its PDF URL; other URLs are returned unchanged."""
+    return _OPENREVIEW_FORUM_RE.sub(r'\1pdf?', url, count=1)
+
+# Max number of paper PDFs downloaded at once by fetch_multiple_papers
+FETCH_CONCURRENCY = 10
+
+# Shared HTTP client for paper downloads (created on first use). Keeping one
+# long-lived client reuses TCP/TLS connections to openreview.net across
+# requests, and HTTP/2 multiplexes concurrent downloads over them.
+_http_client = None
+
+def get_http_client():
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            follow_redirects=True,
+        )
+    return _http_client
+
+async def close_http_client():
+    """Close the shared HTTP client (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+# Process pool for PDF parsing (created on first use). Parsing is CPU-bound and
+# PDFium isn't thread-safe, so papers are parsed in separate processes.
+_pdf_executor = None
+
+# LRU cache of extracted paper text - key is PDF URL, value is
+# {"etag", "last_modified", "text"} used to revalidate with a conditional GET
+_paper_text_cache = OrderedDict()
+PAPER_TEXT_CACHE_SIZE = 200
+
+PDF_WORKERS = min(FETCH_CONCURRENCY, os.cpu_count() or 1)
+# PDFs with more pages than this are split into page ranges parsed in parallel
+PDF_FANOUT_MIN_PAGES = 20
 
-async def fetch_paper_text(url: str):
+def _get_pdf_executor():
+    """Lazily start the process pool used to parse PDFs."""
+    global _pdf_executor
+    if _pdf_executor is None:
+        # spawn: workers only import backend.pdf_text, not this module's Chroma
+        # client/model, and don't inherit the server's threads
+        _pdf_executor = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pdf_executor
+
+async def _parse_pdf(content: bytes, max_chars: int = None):
+    """
+    Extract a PDF's text in the process pool: off the event loop, across cores
+    when several papers arrive together, and for long PDFs across page ranges.
+    With max_chars, pages are read in order only until that much text is found.
+    """
+    loop = asyncio.get_running_loop()
+    executor = _get_pdf_executor()
+    if max_chars is not None:
+        text = await loop.run_in_executor(executor, extract_pdf_text, content, 0, None, max_chars)
+        return text[:max_chars]
+    n_pages = count_pdf_pages(content)
+    if n_pages <= PDF_FANOUT_MIN_PAGES or PDF_WORKERS == 1:
+        return await loop.run_in_executor(executor, extract_pdf_text, content)
+    
+    n_chunks = min(PDF_WORKERS, -(-n_pages // PDF_FANOUT_MIN_PAGES))
+    bounds = [n_pages * i // n_chunks for i in range(n_chunks + 1)]
+    parts = await asyncio.gather(*(
+        loop.run_in_executor(executor, extract_pdf_text, content, start, stop)
+        for start, stop in zip(bounds, bounds[1:])
+    ))
+    return "".join(parts)
+
+async def fetch_paper_text(url: str, http_client: httpx.AsyncClient = None, max_chars: int = None):
     """
     Fetches the full text of a paper given its URL.
     Tries to find a PDF link and extract text.
+    Uses the shared module client unless http_client is given.
+    With max_chars, only the first max_chars characters are extracted.
     """
     # Basic implementation: 
     # 1. If URL is OpenReview, try to find /pdf link
     # 2. Download PDF
     # 3. Extract text
     
-    pdf_url = None
-    if "openreview.net" in url:
-        # OpenReview usually has /pdf?id=...
-        if "/forum?" in url:
-            pdf_url = url.replace("/forum?", "/pdf?")
-        elif "/pdf?" in url:
-            pdf_url = url
-            
-    if not pdf_url:
+    # OpenReview usually has /pdf?id=...
+    pdf_url = to_pdf_url(url)
+    if "openreview.net/pdf?" not in pdf_url:
         return f"Could not determine PDF URL from {url}"
 
+    if http_client is None:
+        http_client = get_http_client()
+
+    # Revalidate a cached copy instead of re-downloading and re-parsing it.
+    # Without ETag/Last-Modified there is nothing to revalidate against, so
+    # the cached text is served as-is.
+    cached = _paper_text_cache.get(pdf_url)
+    # Text extracted under a smaller budget can't serve a larger request
+    if cached and cached["max_chars"] is not None and (max_chars is None or max_chars > cached["max_chars"]):
+        cached = None
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+        if not headers:
+            _paper_text_cache.move_to_end(pdf_url)
+            return cached["text"][:max_chars]
+
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(pdf_url, follow_redirects=True)
-            response.raise_for_status()
-            
-            # Check if content type is PDF
-            if "application/pdf" not in response.headers.get("content-type", ""):
-                 return f"URL {url} did not return a PDF."
-                 
-            f = io.BytesIO(response.content)
-            reader = pypdf.PdfReader(f)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return text
+        response = await http_client.get(pdf_url, headers=headers)
+        if cached and response.status_code == 304:
+            _paper_text_cache.move_to_end(pdf_url)
+            return cached["text"][:max_chars]
+        response.raise_for_status()
+        
+        # Check if content type is PDF
+        if "application/pdf" not in response.headers.get("content-type", ""):
+             return f"URL {url} did not return a PDF."
+             
+        text = await _parse_pdf(response.content, max_chars)
+        
+        _paper_text_cache[pdf_url] = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "text": text,
+            "max_chars": max_chars,
+        }
+        _paper_text_cache.move_to_end(pdf_url)
+        if len(_paper_text_cache) > PAPER_TEXT_CACHE_SIZE:
+            _paper_text_cache.popitem(last=False)
+        
+        return text
     except Exception as e:
         return f"Error fetching paper {url}: {str(e)}"
 
-async def fetch_multiple_papers(urls: list[str]):
-    tasks = [fetch_paper_text(url) for url in urls]
-    return await asyncio.gather(*tasks)
+async def fetch_multiple_papers(urls: list[str], max_chars: int = None):
+    """
+    Fetches several papers concurrently over the shared HTTP/2 client,
+    with at most FETCH_CONCURRENCY downloads in flight.
+    max_chars caps the text extracted per paper (see fetch_paper_text).
+    """
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
 
-# Cache for uploaded Gemini files - key is tuple of (url1, url2, ...) to identify paper set
-_gemini_file_cache = {}
+    async def fetch_one(url):
+        async with semaphore:
+            return await fetch_paper_text(url, max_chars=max_chars)
 
-async def answer_question_with_urls(paper_urls: list[tuple[str, str]], question: str, model: str = "gemini", api_key: str = None, gemini_model: str = None, system_prompt: str = None, use_cache: bool = True):
+    return await asyncio.gather(*(fetch_one(url) for url in urls))
+
+# Semantic cache of LLM answers - key is (context key, question), value is
+# (normalized question embedding, answer). The context key identifies the
+# papers, model and system prompt; a new question about the same context reuses
+# a cached answer when its embedding is close enough to a cached question's.
+_answer_cache = OrderedDict()
+ANSWER_CACHE_SIZE = 1024
+ANSWER_CACHE_SIMILARITY = 0.95
+
+# Characters of paper text each model gets in answer_question (None: no limit).
+# Papers are only extracted up to this budget, since the rest would be cut.
+CONTEXT_MAX_CHARS = {"openai": None, "gemini": 30000}
+
+def _question_embedding(question: str):
+    embedding = np.asarray(_embed_query(question), dtype=np.float32)
+    norm = np.linalg.norm(embedding)
+    return embedding / norm if norm else embedding
+
+def _lookup_answer(context_key, question: str):
+    """Return a cached answer for this context and an equivalent question, or None."""
+    exact = _answer_cache.get((context_key, question))
+    if exact is not None:
+        _answer_cache.move_to_end((context_key, question))
+        return exact[1]
+    embedding = _question_embedding(question)
+    best_key, best_score = None, ANSWER_CACHE_SIMILARITY
+    for cache_key, (cached_embedding, _) in _answer_cache.items():
+        if cache_key[0] != context_key:
+            continue
+        score = float(np.dot(cached_embedding, embedding))
+        if score >= best_score:
+            best_key, best_score = cache_key, score
+    if best_key is None:
+        return None
+    _answer_cache.move_to_end(best_key)
+    return _answer_cache[best_key][1]
+
+def _store_answer(context_key, question: str, answer: str):
+    _answer_cache[(context_key, question)] = (_question_embedding(question), answer)
+    _answer_cache.move_to_end((context_key, question))
+    if len(_answer_cache) > ANSWER_CACHE_SIZE:
+        _answer_cache.popitem(last=False)
+
+# LLM clients are created lazily and reused across calls so their connection
+# pools persist; the SDKs stay optional imports
+_openai_clients = {}
+# GenerativeModel per (api key, model name); each creates its client on first use
+_gemini_models = {}
+
+def get_openai_client(key: str):
+    client = _openai_clients.get(key)
+    if client is None:
+        from openai import OpenAI
+        client = _openai_clients[key] = OpenAI(api_key=key)
+    return client
+
+def get_genai(key: str):
+    # genai's key is process-wide and other callers may have changed it, so
+    # configure on every call rather than remembering the last key
+    import google.generativeai as genai
+    genai.configure(api_key=key)
+    return genai
+
+def get_gemini_model(key: str, model_name: str):
+    # Configure first: a model builds its client from the configured key when first used
+    genai = get_genai(key)
+    model = _gemini_models.get((key, model_name))
+    if model is None:
+        model = _gemini_models[(key, model_name)] = genai.GenerativeModel(model_name)
+    return model
+
+# Uploaded Gemini files per paper set - key is tuple of (url1, url2, ...).
+# Bounded LRU; entries expire well before Gemini deletes the files server-side (48h).
+GEMINI_FILE_CACHE_SIZE = 64
+GEMINI_FILE_TTL = 24 * 3600
+_gemini_file_cache = OrderedDict()  # key -> (uploaded_at, [(title, file), ...])
+# Uploads in flight, so concurrent requests for the same paper set share one upload
+_gemini_uploads = {}
+
+def _get_gemini_files(cache_key):
+    entry = _gemini_file_cache.get(cache_key)
+    if entry is None:
+        return None
+    uploaded_at, files = entry
+    if time.monotonic() - uploaded_at > GEMINI_FILE_TTL:
+        del _gemini_file_cache[cache_key]
+        return None
+    _gemini_file_cache.move_to_end(cache_key)
+    return files
+
+def _delete_gemini_files(genai, files):
+    for _, file in files:
+        try:
+            genai.delete_file(file.name)
+        except Exception as e:
+            print(f"[DEBUG] Failed to delete Gemini file {getattr(file, 'name', file)}: {e}")
+
+def _store_gemini_files(genai, cache_key, files):
+    _gemini_file_cache[cache_key] = (time.monotonic(), files)
+    _gemini_file_cache.move_to_end(cache_key)
+    while len(_gemini_file_cache) > GEMINI_FILE_CACHE_SIZE:
+        _, (_, evicted) = _gemini_file_cache.popitem(last=False)
+        # Release the evicted uploads on Gemini's side without blocking the request
+        asyncio.get_running_loop().run_in_executor(None, _delete_gemini_files, genai, evicted)
+
+async def _upload_papers(genai, paper_urls: list[tuple[str, str]], cache_key):
+    """
+    Upload the papers' PDFs to Gemini and cache the resulting files.
+    Returns (uploaded_files, status_messages).
+    """
+    uploaded_files = []
+    status_messages = []
+    total = len(paper_urls)
+    print(f"[DEBUG] Uploading {total} papers to Gemini...")
+    
+    # Download and upload all papers concurrently (at most
+    # FETCH_CONCURRENCY at a time); results keep the input order
+    http_client = get_http_client()
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def upload_one(idx, title, url):
+        # Convert OpenReview forum URL to PDF URL
+        pdf_url = to_pdf_url(url)
+        async with semaphore:
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            try:
+                # Download PDF
+                response = await http_client.get(pdf_url)
+                response.raise_for_status()
+
+                # Upload straight from memory (the SDK call blocks, so run it in a thread)
+                uploaded_file = await asyncio.to_thread(
+                    genai.upload_file,
+                    io.BytesIO(response.content),
+                    mime_type="application/pdf",
+                    display_name=title,
+                )
+                status_msg = f"[{timestamp}] ✓ Uploaded {idx}/{total}"
+                print(f"[DEBUG] {status_msg}")
+                return (title, uploaded_file), status_msg
+            except Exception as e:
+                error_msg = f"[{timestamp}] ✗ Failed to upload paper {idx}/{total}"
+                print(f"[DEBUG] {error_msg}: {str(e)}")
+                return None, error_msg
+
+    results = await asyncio.gather(
+        *(upload_one(idx, title, url) for idx, (title, url) in enumerate(paper_urls, 1))
+    )
+    for uploaded, status_msg in results:
+        if uploaded is not None:
+            uploaded_files.append(uploaded)
+        status_messages.append(status_msg)
+
+    if not uploaded_files:
+        return uploaded_files, status_messages
+    
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    print(f"[DEBUG] Successfully uploaded {len(uploaded_files)} papers")
+    status_messages.append(f"[{timestamp}] ✅ Successfully uploaded {len(uploaded_files)}/{total} papers")
+    status_messages.append(f"[{timestamp}] 🤖 Generating answer...")
+    
+    # Cache the uploaded files
+    _store_gemini_files(genai, cache_key, uploaded_files)
+    return uploaded_files, status_messages
+
+async def stream_answer_question_with_urls(paper_urls: list[tuple[str, str]], question: str, model: str = "gemini", api_key: str = None, gemini_model: str = None, system_prompt: str = None, use_cache: bool = True):
     """
-    Uses Gemini's native file reading to answer questions about papers from URLs.
+    Uses Gemini's native file reading to answer questions about papers from URLs,
+    yielding the upload status first and then the answer as Gemini generates it.
     paper_urls: list of (title, url) tuples
     use_cache: if True, reuse previously uploaded files for the same paper set
     """
     if model != "gemini":
-        return "URL-based paper reading is only supported with Gemini models."
+        yield "URL-based paper reading is only supported with Gemini models."
+        return
     
     if not system_prompt:
         system_prompt = "You are a helpful assistant answering questions about research papers. Use the provided paper PDFs to answer the question."
     
     key = api_key or os.getenv("GEMINI_API_KEY")
     if not key:
-        return "Gemini API Key not found. Please use the settings (cog wheel) to add your API key."
+        yield "Gemini API Key not found. Please use the settings (cog wheel) to add your API key."
+        return
     
     try:
-        import google.generativeai as genai
-        import tempfile
-        genai.configure(api_key=key)
+        genai = get_genai(key)
         
         # Use the specified model or default to gemini-1.5-flash
         model_name = gemini_model or 'gemini-1.5-flash'
-        gemini_model_obj = genai.GenerativeModel(model_name)
+        gemini_model_obj = get_gemini_model(key, model_name)
         
         # Create cache key from URLs
         cache_key = tuple(url for _, url in paper_urls)
         
+        answer_key = ("gemini-urls", model_name, system_prompt, cache_key)
+        cached_answer = _lookup_answer(answer_key, question)
+        if cached_answer is not None:
+            print(f"[DEBUG] Using cached answer for {len(paper_urls)} papers")
+            yield f"✓ Using cached answer\n\n---\n\n{cached_answer}"
+            return
+        
         # Check cache
-        if use_cache and cache_key in _gemini_file_cache:
-            uploaded_files = _gemini_file_cache[cache_key]
+        uploaded_files = _get_gemini_files(cache_key) if use_cache else None
+        if uploaded_files is not None:
             print(f"[DEBUG] Using cached files for {len(uploaded_files)} papers")
             status_messages = [f"✓ Using {len(uploaded_files)} previously uploaded papers"]
         else:
-            # Upload PDFs to Gemini
-            uploaded_files = []
-            status_messages = []
-            total = len(paper_urls)
-            print(f"[DEBUG] Uploading {total} papers to Gemini...")
-            
-            async with httpx.AsyncClient() as client:
-                for idx, (title, url) in enumerate(paper_urls, 1):
-                    # Convert OpenReview forum URL to PDF URL
-                    pdf_url = url.replace("/forum?", "/pdf?") if "/forum?" in url else url
-                    try:
-                        from datetime import datetime
-                        timestamp = datetime.now().strftime("%H:%M:%S")
-                        
-                        # Download PDF
-                        response = await client.get(pdf_url, follow_redirects=True)
-                        response.raise_for_status()
-                        
-                        # Save temporarily and upload
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-                            tmp.write(response.content)
-                            tmp_path = tmp.name
-                        
-                        uploaded_file = genai.upload_file(tmp_path, display_name=title)
-                        uploaded_files.append((title, uploaded_file))
-                        status_msg = f"[{timestamp}] ✓ Uploaded {idx}/{total}"
-                        print(f"[DEBUG] {status_msg}")
-                        status_messages.append(status_msg)
-                        
-                        # Clean up temp file
-                        import os
-                        os.unlink(tmp_path)
-                    except Exception as e:
-                        from datetime import datetime
-                        timestamp = datetime.now().strftime("%H:%M:%S")
-                        error_msg = f"[{timestamp}] ✗ Failed to upload paper {idx}/{total}"
-                        print(f"[DEBUG] {error_msg}: {str(e)}")
-                        status_messages.append(error_msg)
+            # Join an upload of the same paper set that is already running
+            task = _gemini_uploads.get(cache_key) if use_cache else None
+            if task is None:
+                task = asyncio.ensure_future(_upload_papers(genai, paper_urls, cache_key))
+                if use_cache:
+                    _gemini_uploads[cache_key] = task
+                    task.add_done_callback(lambda _: _gemini_uploads.pop(cache_key, None))
+            # shield: one caller disconnecting must not cancel the others' upload
+            uploaded_files, status_messages = await asyncio.shield(task)
+            status_messages = list(status_messages)
             
             if not uploaded_files:
-                return "Failed to upload any papers to Gemini."
-            
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            print(f"[DEBUG] Successfully uploaded {len(uploaded_files)} papers")
-            status_messages.append(f"[{timestamp}] ✅ Successfully uploaded {len(uploaded_files)}/{total} papers")
-            status_messages.append(f"[{timestamp}] 🤖 Generating answer...")
-            
-            # Cache the uploaded files
-            _gemini_file_cache[cache_key] = uploaded_files
+                yield "Failed to upload any papers to Gemini."
+                return
         
         # Build prompt with file references
         prompt_parts = [system_prompt, "\n\nPapers:\n"]
@@ -348,14 +668,32 @@ async def answer_question_with_urls(paper_urls: list[tuple[str, str]], question:
             prompt_parts.append(file)
         prompt_parts.append(f"\n\nQuestion: {question}")
         
-        response = gemini_model_obj.generate_content(prompt_parts)
-        
-        # Prepend status messages to the response
-        status_text = "\n".join(status_messages)
-        return f"{status_text}\n\n---\n\n{response.text}"
+        # Send the upload status right away, then stream the answer so the
+        # first tokens show up without waiting for the full generation
+        yield "\n".join(status_messages) + "\n\n---\n\n"
+        response = await gemini_model_obj.generate_content_async(prompt_parts, stream=True)
+        answer_parts = []
+        async for chunk in response:
+            answer_parts.append(chunk.text)
+            yield chunk.text
+        _store_answer(answer_key, question, "".join(answer_parts))
         
     except Exception as e:
-        return f"Error calling Gemini with URLs: {str(e)}"
+        yield f"Error calling Gemini with URLs: {str(e)}"
+
+async def answer_question_with_urls(paper_urls: list[tuple[str, str]], question: str, model: str = "gemini", api_key: str = None, gemini_model: str = None, system_prompt: str = None, use_cache: bool = True):
+    """
+    Non-streaming variant of stream_answer_question_with_urls: returns the full response text.
+    """
+    stream = stream_answer_question_with_urls(paper_urls, question, model, api_key, gemini_model, system_prompt, use_cache)
+    return "".join([part async for part in stream])
+
+def _papers_prompt(context: str, question: str, system_prompt: str = None):
+    """The papers + question prompt, prefixed by system_prompt when given (one join, no intermediate strings)."""
+    parts = ("Papers Content:\n", context, "\n\nQuestion: ", question)
+    if system_prompt:
+        parts = (system_prompt, "\n\n") + parts
+    return "".join(parts)
 
 def answer_question(context: str, question: str, model: str = "openai", api_key: str = None, gemini_model: str = None, openai_model: str = None, system_prompt: str = None):
     """
@@ -365,8 +703,8 @@ def answer_question(context: str, question: str, model: str = "openai", api_key:
     # Default system prompt if not provided
     if not system_prompt:
         system_prompt = "You are a helpful assistant answering questions about research papers. Use the provided paper content to answer the question."
-    
-    print(system_prompt)
+
+    answer_key = (model, openai_model if model == "openai" else gemini_model, system_prompt, hash(context))
 
     if model == "openai":
         key = api_key or os.getenv("OPENAI_API_KEY")
@@ -374,8 +712,7 @@ def answer_question(context: str, question: str, model: str = "openai", api_key:
              return "OpenAI API Key not found. Please set OPENAI_API_KEY in backend/.env or provide it in the UI."
         
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=key)
+            client = get_openai_client(key)
             
             # No truncation - send full context
             print(f"[DEBUG] Context length (OpenAI): {len(context)} characters")
@@ -383,14 +720,20 @@ def answer_question(context: str, question: str, model: str = "openai", api_key:
             # Use the specified model or default to gpt-4o
             model_name = openai_model or 'gpt-4o'
             
+            cached_answer = _lookup_answer(answer_key, question)
+            if cached_answer is not None:
+                return cached_answer
+            
             response = client.chat.completions.create(
                 model=model_name,
                 messages=[
                     {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Papers Content:\n{context}\n\nQuestion: {question}"}
+                    {"role": "user", "content": _papers_prompt(context, question)}
                 ]
             )
-            return response.choices[0].message.content
+            answer = response.choices[0].message.content
+            _store_answer(answer_key, question, answer)
+            return answer
         except Exception as e:
             return f"Error calling OpenAI: {str(e)}"
 
@@ -400,21 +743,24 @@ def answer_question(context: str, question: str, model: str = "openai", api_key:
             return "Gemini API Key not found. Please use the settings (cog wheel) to add your API key."
             
         try:
-            import google.generativeai as genai
-            genai.configure(api_key=key)
-            
             # Gemini 1.5 Pro has a large context window, so we can be more generous or pass full text
             # But let's still be reasonable.
             print(f"[DEBUG] Context length before truncation: {len(context)} characters")
-            truncated_text = context[:30000]
+            truncated_text = context[:CONTEXT_MAX_CHARS["gemini"]]
             print(f"[DEBUG] Context length after truncation (Gemini): {len(truncated_text)} characters")
             
             # Use the specified model or default to gemini-1.5-flash
             model_name = gemini_model or 'gemini-1.5-flash'
-            gemini_model_obj = genai.GenerativeModel(model_name)
+            
+            cached_answer = _lookup_answer(answer_key, question)
+            if cached_answer is not None:
+                return cached_answer
+            
+            gemini_model_obj = get_gemini_model(key, model_name)
             response = gemini_model_obj.generate_content(
-                f"{system_prompt}\n\nPapers Content:\n{truncated_text}\n\nQuestion: {question}"
+                _papers_prompt(truncated_text, question, system_prompt)
             )
+            _store_answer(answer_key, question, response.text)
             return response.text
         except Exception as e:
             return f"Error calling Gemini: {str(e)}"
@@ -422,8 +768,17 @@ def answer_question(context: str, question: str, model: str = "openai", api_key:
     else:
         return f"Unknown model: {model}"
 
-# Cache for filters
-_filters_cache = None
+# Cache for filters, keyed by the mtime of the filters file it came from (None:
+# no file) so an out-of-process ingest rewriting it is picked up on the next
+# call. The lock keeps concurrent first requests from building it twice.
+_filters_cache = None  # (filters file mtime, filters)
+_filters_lock = threading.Lock()
+
+def _filters_mtime():
+    try:
+        return os.path.getmtime(FILTERS_PATH)
+    except OSError:
+        return None
 
 def get_filters():
     try:
@@ -432,91 +787,72 @@ def get_filters():
         return {"authors": [], "affiliations": [], "sessions": [], "days": [], "ampm": ["AM", "PM"]}
     
     global _filters_cache
-    if _filters_cache:
-        return _filters_cache
+    mtime = _filters_mtime()
+    cached = _filters_cache
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    with _filters_lock:
+        cached = _filters_cache
+        if cached and cached[0] == mtime:
+            return cached[1]
         
-    import pandas as pd
-    try:
-        # Read all CSV files to get unique values
-        papers_path = "../data/papercopilot_neurips2025_merged_openreview.csv"
-        if not os.path.exists(papers_path):
-            papers_path = "data/papercopilot_neurips2025_merged_openreview.csv"
+        # Vocabularies precomputed by ingest; parsing the CSVs below is the fallback
+        # for databases built before ingest wrote them
+        precomputed = load_filters()
+        if precomputed:
+            _filters_cache = (mtime, precomputed)
+            return precomputed
+        
+        try:
+            # Read all CSV files to get unique values
+            papers_path = "../data/papercopilot_neurips2025_merged_openreview.csv"
+            if not os.path.exists(papers_path):
+                papers_path = "data/papercopilot_neurips2025_merged_openreview.csv"
             
-        events_path = "../data/neurips_2025_enriched_events.csv"
-        if not os.path.exists(events_path):
-            events_path = "data/neurips_2025_enriched_events.csv"
+            events_path = "../data/neurips_2025_enriched_events.csv"
+            if not os.path.exists(events_path):
+                events_path = "data/neurips_2025_enriched_events.csv"
         
-        expo_path = "../data/neurips_2025_expo_events.csv"
-        if not os.path.exists(expo_path):
-            expo_path = "data/neurips_2025_expo_events.csv"
+            expo_path = "../data/neurips_2025_expo_events.csv"
+            if not os.path.exists(expo_path):
+                expo_path = "data/neurips_2025_expo_events.csv"
         
-        # Read all CSVs
-        df_papers = pd.read_csv(papers_path)
-        df_events = pd.read_csv(events_path) if os.path.exists(events_path) else pd.DataFrame()
-        df_expo = pd.read_csv(expo_path) if os.path.exists(expo_path) else pd.DataFrame()
+            # Read all CSVs with Arrow's multithreaded parser, converting only the
+            # filter columns (the abstracts are most of the bytes). Abstracts span
+            # several lines, hence newlines_in_values.
+            def read_filter_csv(path):
+                table = pacsv.read_csv(
+                    path,
+                    parse_options=pacsv.ParseOptions(newlines_in_values=True),
+                    convert_options=pacsv.ConvertOptions(
+                        include_columns=FILTER_COLUMNS,
+                        include_missing_columns=True,
+                        column_types={c: pa.string() for c in FILTER_COLUMNS},
+                        strings_can_be_null=True,
+                    ),
+                )
+                return table.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+            df_papers = read_filter_csv(papers_path)
+            df_events = read_filter_csv(events_path) if os.path.exists(events_path) else pd.DataFrame()
+            df_expo = read_filter_csv(expo_path) if os.path.exists(expo_path) else pd.DataFrame()
         
-        # Combine for filters
-        dfs_to_combine = [df_papers]
-        if not df_events.empty:
-            dfs_to_combine.append(df_events)
-        if not df_expo.empty:
-            dfs_to_combine.append(df_expo)
-        df = pd.concat(dfs_to_combine, ignore_index=True)
+            # Combine for filters
+            dfs_to_combine = [df_papers]
+            if not df_events.empty:
+                dfs_to_combine.append(df_events)
+            if not df_expo.empty:
+                dfs_to_combine.append(df_expo)
+            df = pd.concat(dfs_to_combine, ignore_index=True)
         
-        # Helper to split and clean
-        def get_unique(col):
-            if col not in df.columns: return []
-            values = set()
-            for x in df[col].dropna():
-                # Split by semicolon or comma if multiple values
-                # The data seems to use various separators or just strings.
-                # Let's just take unique strings for now to be safe, or split if obvious.
-                # The ingest script split by comma/semicolon.
-                parts = str(x).replace(';', ',').split(',')
-                for p in parts:
-                    clean = p.strip()
-                    if clean:
-                        values.add(clean)
-            return sorted(list(values))
-
-        # Derive day list (Tue to Sun) from both CSVs
-        # Prefer actual values present in neurips_starttime
-        # Filter out Monday (Dec 1) - events in Mexico, not San Diego
-        days_set = set()
-        if "neurips_starttime" in df.columns:
-            for v in df["neurips_starttime"].dropna():
-                try:
-                    date_part = str(v).split('T')[0]
-                    # Filter: San Diego events only (Tue Dec 2 - Sun Dec 7)
-                    if date_part and date_part >= "2025-12-02" and date_part <= "2025-12-07":
-                        days_set.add(date_part)
-                except Exception:
-                    pass
-        days = sorted(days_set)
-        # If empty, fall back to known conference dates (Dec 1-7, 2025)
-        if not days:
-            days = [
-                "2025-12-01",
-                "2025-12-02",
-                "2025-12-03",
-                "2025-12-04",
-                "2025-12-05",
-                "2025-12-06",
-                "2025-12-07",
-            ]
-
-        # Build sessions excluding any Mexico City related entries
-        raw_sessions = get_unique("neurips_session")
-        sessions = [s for s in raw_sessions if 'mexico' not in s.lower()]
-
-        _filters_cache = {
-            "affiliations": get_unique("affiliation"),
-            "authors": get_unique("authors"),
-            "sessions": sessions,
-            "days": days,
-            "ampm": ["AM", "PM"]
-        }
-        return _filters_cache
-    except Exception as e:
-        print(f"Error loading filters: {e}")
-        return {"affiliations": [], "authors": [], "sessions": [], "days": [], "ampm": ["AM", "PM"]}
+            filters = build_filters(df)
+            # Persist it like ingest would, so later restarts skip the CSV parse
+            try:
+                write_filters(filters)
+            except OSError as e:
+                print(f"Could not save filters: {e}")
+            _filters_cache = (_filters_mtime(), filters)
+            return filters
+        except Exception as e:
+            print(f"Error loading filters: {e}")
+            return {"affiliations": [], "authors": [], "sessions": [], "days": [], "ampm": ["AM", "PM"]}
@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { useSession } from 'next-auth/react';
-import { Paper, chatWithPapers, PaperItem, getGeminiModels, getOpenAIModels, GeminiModel } from '@/lib/api';
+import { Paper, chatWithPapers, chatWithPapersStream, PaperItem, getGeminiModels, getOpenAIModels, GeminiModel } from '@/lib/api';
 import { X, Send, Bot, Settings, Maximize2, Minimize2, Edit3 } from 'lucide-react';
 import ReactMarkdown from 'react-markdown';
 import remarkMath from 'remark-math';
@@ -228,17 +228,26 @@ export default function ChatPanel({ selectedPapers, onClose }: ChatPanelProps) {
 
             const currentKey = model === 'openai' ? apiKeys.openai : apiKeys.gemini;
             console.log('Sending API key:', currentKey ? 'Key present (length: ' + currentKey.length + ')' : 'No key');
-            const res = await chatWithPapers(
+            // Show the answer while it streams in: add the assistant message on
+            // the first chunk, then keep replacing its content
+            let started = false;
+            await chatWithPapersStream(
                 paperItems,
                 userMsg,
+                (answer) => {
+                    if (!started) {
+                        started = true;
+                        setMessages(prev => [...prev, { role: 'assistant', content: answer }]);
+                    } else {
+                        setMessages(prev => [...prev.slice(0, -1), { role: 'assistant', content: answer }]);
+                    }
+                },
                 model,
                 currentKey || undefined,
                 model === 'gemini' ? selectedGeminiModel : undefined,
                 model === 'openai' ? selectedOpenaiModel : undefined,
                 systemPrompt
             );
-
-            setMessages(prev => [...prev, { role: 'assistant', content: res.answer }]);
         } catch (error: unknown) {
             console.error('Chat error:', error);
             const errorMessage = error instanceof Error
@@ -71,6 +71,42 @@ export async function chatWithPapers(
     return response.json();
 }
 
+export async function chatWithPapersStream(
+    papers: PaperItem[],
+    question: string,
+    onChunk: (text: string) => void,
+    model: string = "openai",
+    api_key?: string,
+    gemini_model?: string,
+    openai_model?: string,
+    system_prompt?: string
+) {
+    const response = await fetch(`${API_URL}/chat/stream`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ papers, question, model, api_key, gemini_model, openai_model, system_prompt }),
+    });
+    if (!response.ok || !response.body) {
+        const errorText = await response.text();
+        throw new Error(`Failed to chat with papers: ${response.status} ${response.statusText} - ${errorText}`);
+    }
+    // Hand each piece of the answer to the caller as soon as it arrives
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let answer = '';
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        answer += decoder.decode(value, { stream: true });
+        onChunk(answer);
+    }
+    answer += decoder.decode();
+    onChunk(answer);
+    return answer;
+}
+
 export async function getFilters() {
     try {
         const response = await fetch(`${API_URL}/filters`);
@@ -1,12 +1,15 @@
 import requests
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 import os
 
 URL = "https://neurips.cc/Downloads/2025"
 OUTPUT_DIR = "data"
 OUTPUT_FILE = "neurips_2025_schedule.csv"
 
-def download_csv():
+def download_csv(output_path=None):
+    """Download the schedule CSV with a plain form POST; return its path or None."""
+    if output_path is None:
+        output_path = os.path.join(OUTPUT_DIR, OUTPUT_FILE)
     session = requests.Session()
     session.headers.update({
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -19,20 +22,20 @@ def download_csv():
     resp = session.get(URL)
     resp.raise_for_status()
     
-    soup = BeautifulSoup(resp.text, "html.parser")
-    csrf_token = soup.find("input", {"name": "csrfmiddlewaretoken"})
-    if not csrf_token:
+    tree = LexborHTMLParser(resp.text)
+    csrf_token = tree.css_first('input[name="csrfmiddlewaretoken"]')
+    if csrf_token is None:
         print("Could not find CSRF token.")
-        return
+        return None
     
-    token = csrf_token["value"]
+    token = csrf_token.attributes["value"]
     print(f"Found CSRF token: {token}")
     
     # 2. Prepare POST data
     # Based on browser inspection: file_format=0 is CSV
     # We want all event types. The form likely has checkboxes.
     # Usually they are named like 'posters', 'tutorials', etc.
-    # Let's inspect the form inputs from the soup to be sure.
+    # Let's inspect the form inputs from the page to be sure.
     
     data = {
         "csrfmiddlewaretoken": token,
@@ -41,9 +44,9 @@ def download_csv():
     }
     
     # Find all checkboxes and set them to 'on' (or their value)
-    checkboxes = soup.find_all("input", {"type": "checkbox"})
+    checkboxes = tree.css('input[type="checkbox"]')
     for cb in checkboxes:
-        name = cb.get("name")
+        name = cb.attributes.get("name")
         if name:
             data[name] = "on" # or cb.get("value", "on")
             print(f"Enabling {name}")
@@ -58,14 +61,15 @@ def download_csv():
     print(f"Response Content-Type: {content_type}")
     
     if "text/csv" in content_type or "application/csv" in content_type or "attachment" in post_resp.headers.get("Content-Disposition", ""):
-        output_path = os.path.join(OUTPUT_DIR, OUTPUT_FILE)
         with open(output_path, "wb") as f:
             for chunk in post_resp.iter_content(chunk_size=8192):
                 f.write(chunk)
         print(f"Downloaded to {output_path}")
-    else:
-        print("Did not receive a CSV file. Response might be HTML.")
-        # print(post_resp.text[:500])
+        return output_path
+
+    print("Did not receive a CSV file. Response might be HTML.")
+    # print(post_resp.text[:500])
+    return None
 
 if __name__ == "__main__":
     download_csv()
@@ -1,16 +1,29 @@
+import asyncio
 import csv
+import json
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+import httpx
+from http_utils import get_with_backoff
+from selectolax.lexbor import LexborHTMLParser
 import time
 import os
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configuration
 INPUT_CSV = "data/neurips_2025_schedule.csv"
 OUTPUT_CSV = "data/neurips_2025_enriched_events.csv"
 BASE_URL = "https://neurips.cc"
+# Max event pages fetched at once
+SCRAPE_CONCURRENCY = 50
+
+# Scraped (location, time) per event URL, reused across runs until it expires
+SCRAPE_CACHE_PATH = "data/.scrape_cache.json"
+SCRAPE_CACHE_TTL = 7 * 24 * 3600  # seconds
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_NEURIPS_ID_RE = re.compile(r'/(\d+)$')
+_DAY_RE = re.compile(r'\b(\d{1,2})\b')
+_TIME_RE = re.compile(r'(\d{1,2})(?::(\d{2}))?\s*([ap]\.?m\.?)', re.IGNORECASE)
 
 # Headers for scraping
 HEADERS = {
@@ -20,22 +33,67 @@ HEADERS = {
 def normalize_title(title):
     if not isinstance(title, str):
         return ""
-    return re.sub(r'\s+', ' ', title).strip().lower()
+    return _WHITESPACE_RE.sub(' ', title).strip().lower()
 
-def parse_neurips_page(url):
+async def fetch_neurips_page(client, url, semaphore):
     """
-    Scrapes location and time from an event page.
+    Downloads an event page, returning its raw HTML bytes or None.
+    The bytes go straight to the parser; decoding them to str first would
+    only be re-encoded to UTF-8 by lexbor.
     """
     if not url or not isinstance(url, str) or not url.startswith("http"):
-        return "", ""
+        return None
         
+    async with semaphore:
+        try:
+            response = await get_with_backoff(client, url)
+        except Exception as e:
+            print(f"Error scraping {url}: {e}")
+            return None
+    if response.status_code != 200:
+        print(f"Failed to fetch {url}: {response.status_code}")
+        return None
+    return response.content
+
+def load_scrape_cache(path=SCRAPE_CACHE_PATH):
+    """
+    Load cached scrape results as {url: [scraped_at, location, datetime_raw]},
+    dropping expired entries. Missing or unreadable files give an empty cache.
+    """
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        if response.status_code != 200:
-            print(f"Failed to fetch {url}: {response.status_code}")
-            return "", ""
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    cutoff = time.time() - SCRAPE_CACHE_TTL
+    return {url: entry for url, entry in cache.items() if entry[0] >= cutoff}
+
+def save_scrape_cache(cache, path=SCRAPE_CACHE_PATH):
+    """Persist the scrape cache (atomic swap, so a crash never leaves half a file)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+def node_text(node):
+    """
+    Text of a node with its text pieces stripped and joined by single spaces,
+    matching BeautifulSoup's get_text(" ", strip=True).
+    """
+    parts = node.text(separator="\x00", strip=True).split("\x00")
+    return " ".join(part for part in parts if part)
+
+def parse_neurips_page(html):
+    """
+    Extracts location and time from an event page's HTML.
+    """
+    if not html:
+        return "", ""
         
-        soup = BeautifulSoup(response.text, "html.parser")
+    try:
+        tree = LexborHTMLParser(html)
+        # Script/style contents are not page text
+        tree.strip_tags(["script", "style"])
         
         location = ""
         datetime_raw = ""
@@ -44,45 +102,48 @@ def parse_neurips_page(url):
         # It usually contains PST/PDT and a dash
         # It's often in a text node or h5/h6/div
         
-        # Find all text elements
-        for tag in soup.find_all(["h5", "h6", "div", "p", "span"]):
-            txt = tag.get_text(" ", strip=True)
-            if not txt:
-                continue
-            
-            # Check for time pattern
-            if "PST" in txt or "PDT" in txt:
-                if "—" in txt or "-" in txt:
-                    # Check length to avoid capturing full page
-                    if len(txt) < 100:
-                        datetime_raw = txt
-                        
-                        # Location is often the previous sibling or close by
-                        # If it's an h5, the location might be the previous h5
-                        prev = tag.find_previous(["h5", "h6"])
-                        if prev:
-                            loc_txt = prev.get_text(" ", strip=True)
-                            if len(loc_txt) < 100 and "Workshop" not in loc_txt and "Tutorial" not in loc_txt:
-                                location = loc_txt
-                        break
+        # Find all text elements (document order), remembering the last
+        # h5/h6 seen so far as the candidate location heading
+        prev = None
+        for tag in tree.css("h5, h6, div, p, span"):
+            txt = node_text(tag)
+            if txt:
+                # Check for time pattern
+                if "PST" in txt or "PDT" in txt:
+                    if "—" in txt or "-" in txt:
+                        # Check length to avoid capturing full page
+                        if len(txt) < 100:
+                            datetime_raw = txt
+                            
+                            # Location is often the previous sibling or close by
+                            # If it's an h5, the location might be the previous h5
+                            if prev is not None:
+                                loc_txt = node_text(prev)
+                                if len(loc_txt) < 100 and "Workshop" not in loc_txt and "Tutorial" not in loc_txt:
+                                    location = loc_txt
+                            break
+            if tag.tag in ("h5", "h6"):
+                prev = tag
         
         # Fallback for location if not found via sibling
         if not location:
-            for tag in soup.find_all("h5"):
-                txt = tag.get_text(" ", strip=True)
+            for tag in tree.css("h5"):
+                txt = node_text(tag)
                 if len(txt) < 50 and "Workshop" not in txt and "Tutorial" not in txt and "PST" not in txt:
                     location = txt
                     break
 
         return location, datetime_raw
     except Exception as e:
-        print(f"Error scraping {url}: {e}")
+        print(f"Error parsing event page: {e}")
         return "", ""
 
-def process_row(row):
+async def process_row(client, semaphore, row, scrape_cache):
     """
     Process a single row from the input dataframe.
     Returns a dictionary with mapped columns.
+    Pages already in scrape_cache are not fetched again; new successful
+    scrapes are added to it.
     """
     # Map columns
     # Input: type, name, virtualsite_url, speakers/authors, abstract
@@ -96,13 +157,22 @@ def process_row(row):
     # Extract ID
     neurips_id = ""
     if url and isinstance(url, str):
-        match = re.search(r'/(\d+)$', url)
+        match = _NEURIPS_ID_RE.search(url)
         if match:
             neurips_id = match.group(1)
             
     # Scrape time and location
-    # Only if url is valid
-    location, starttime_raw = parse_neurips_page(url)
+    # Only if url is valid. The download is async; parsing is CPU-bound, so
+    # it runs in a worker thread to keep the other downloads flowing.
+    cached = scrape_cache.get(url) if isinstance(url, str) else None
+    if cached:
+        _, location, starttime_raw = cached
+    else:
+        html = await fetch_neurips_page(client, url, semaphore)
+        location, starttime_raw = await asyncio.to_thread(parse_neurips_page, html)
+        # Failed downloads are retried on the next run
+        if html is not None:
+            scrape_cache[url] = [time.time(), location, starttime_raw]
     
     iso_starttime = ""
     if starttime_raw:
@@ -113,12 +183,12 @@ def process_row(row):
             parts = parts.replace("PST", "").replace("PDT", "").strip()
             
             # Extract day: "1"
-            day_match = re.search(r'\b(\d{1,2})\b', parts)
+            day_match = _DAY_RE.search(parts)
             day = day_match.group(1) if day_match else ""
             
             # Extract time: "6 a.m." or "6:00 a.m."
             # Regex for time: (\d{1,2})(:(\d{2}))?\s*([ap]\.?m\.?)
-            time_match = re.search(r'(\d{1,2})(?::(\d{2}))?\s*([ap]\.?m\.?)', parts, re.IGNORECASE)
+            time_match = _TIME_RE.search(parts)
             
             if day and time_match:
                 hour = int(time_match.group(1))
@@ -165,6 +235,53 @@ def process_row(row):
         "neurips_poster_position": ""
     }
 
+async def enrich_rows(rows, output_csv):
+    """
+    Scrape and map all rows concurrently (at most SCRAPE_CONCURRENCY pages in
+    flight) over one pooled client, streaming each result to output_csv as it
+    completes. Returns the number of rows written.
+    Scrape results are cached on disk (SCRAPE_CACHE_PATH), so a re-run only
+    fetches pages that are new or whose cached entry has expired.
+    """
+    scrape_cache = load_scrape_cache()
+    print(f"Loaded {len(scrape_cache)} cached event pages.")
+    semaphore = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+    limits = httpx.Limits(max_connections=SCRAPE_CONCURRENCY, max_keepalive_connections=SCRAPE_CONCURRENCY)
+    total = len(rows)
+    count = 0
+    written = 0
+    
+    async with httpx.AsyncClient(headers=HEADERS, timeout=10, limits=limits, follow_redirects=True) as client:
+        async def run(row):
+            try:
+                return await process_row(client, semaphore, row, scrape_cache)
+            except Exception as exc:
+                print(f"Row generated an exception: {exc}")
+                return None
+        
+        with open(output_csv, "w", newline="") as f:
+            writer = None
+            try:
+                for next_result in asyncio.as_completed([run(row) for row in rows]):
+                    data = await next_result
+                    count += 1
+                    if count % 10 == 0:
+                        print(f"Processed {count}/{total}")
+                    if data is None:
+                        continue
+                    if writer is None:
+                        writer = csv.DictWriter(f, fieldnames=list(data.keys()))
+                        writer.writeheader()
+                    writer.writerow(data)
+                    written += 1
+                    # Keep partial progress on disk if the run dies midway
+                    if written % 100 == 0:
+                        f.flush()
+                        save_scrape_cache(scrape_cache)
+            finally:
+                save_scrape_cache(scrape_cache)
+    return written
+
 def main():
     if not os.path.exists(INPUT_CSV):
         print(f"Input file {INPUT_CSV} not found.")
@@ -186,31 +303,15 @@ def main():
     df_filtered = df[df['type'] != 'Poster']
     print(f"Processing {len(df_filtered)} non-poster events...")
     
-    enriched_rows = []
-    
-    # Use ThreadPoolExecutor for faster scraping
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_row = {executor.submit(process_row, row): row for _, row in df_filtered.iterrows()}
-        
-        count = 0
-        total = len(df_filtered)
-        
-        for future in as_completed(future_to_row):
-            try:
-                data = future.result()
-                enriched_rows.append(data)
-                count += 1
-                if count % 10 == 0:
-                    print(f"Processed {count}/{total}")
-            except Exception as exc:
-                print(f"Row generated an exception: {exc}")
-
-    # Create DataFrame
-    out_df = pd.DataFrame(enriched_rows)
+    # Plain dicts instead of iterrows(): no per-row Series construction,
+    # and process_row only needs row.get(). Missing values become "" so
+    # they are written as empty cells.
+    rows = df_filtered.fillna("").to_dict('records')
     
-    # Save
-    print(f"Saving to {OUTPUT_CSV}...")
-    out_df.to_csv(OUTPUT_CSV, index=False)
+    # Rows are written as they finish scraping
+    print(f"Writing {OUTPUT_CSV}...")
+    written = asyncio.run(enrich_rows(rows, OUTPUT_CSV))
+    print(f"Saved {written} rows.")
     print("Done.")
 
 if __name__ == "__main__":
@@ -0,0 +1,27 @@
+"""
+HTTP helpers shared by the async scrapers (enrich_events.py, scrape_expo_events.py)
+"""
+import asyncio
+import random
+
+# Retries for rate-limited (429) or overloaded (503) responses
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 30  # seconds
+
+async def get_with_backoff(client, url, **kwargs):
+    """
+    GET url, retrying 429/503 responses up to MAX_RETRIES times. Waits for the
+    server's Retry-After when given in seconds, otherwise backs off
+    exponentially (capped at BACKOFF_CAP) with jitter.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        response = await client.get(url, **kwargs)
+        if response.status_code not in (429, 503) or attempt == MAX_RETRIES:
+            return response
+        retry_after = response.headers.get("retry-after", "")
+        if retry_after.isdigit():
+            delay = min(BACKOFF_CAP, int(retry_after))
+        else:
+            delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) + random.uniform(0, BACKOFF_BASE)
+        await asyncio.sleep(delay)
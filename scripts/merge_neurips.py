@@ -1,6 +1,5 @@
 import pandas as pd
-import json
-import unicodedata
+import orjson
 import re
 
 
@@ -8,15 +7,20 @@ PAPERCOPILOT_CSV = "papercopilot_neurips2025_raw.csv"
 NEURIPS_JSON = "neurips_2025.json"
 OUTPUT_CSV = "papercopilot_neurips2025_merged_openreview.csv"
 
+_WHITESPACE_RE = re.compile(r"\s+")
+_OPENREVIEW_ID_RE = re.compile(r"[?&]id=([^&]+)")
 
-def normalize_title(t: str) -> str:
-    """Lightweight normalization for grouping NeurIPS events by title."""
-    if not isinstance(t, str):
-        return ""
-    t = unicodedata.normalize("NFKC", t)
-    t = t.replace("\n", " ")
-    t = re.sub(r"\s+", " ", t).strip().lower()
-    return t
+
+def normalize_titles(titles: pd.Series) -> pd.Series:
+    """Lightweight normalization for grouping NeurIPS events by title (non-strings become "")."""
+    return (
+        titles.str.normalize("NFKC")
+        .str.replace("\n", " ", regex=False)
+        .str.replace(_WHITESPACE_RE, " ", regex=True)
+        .str.strip()
+        .str.lower()
+        .fillna("")
+    )
 
 
 def extract_openreview_id_from_url(url: str) -> str:
@@ -26,29 +30,29 @@ def extract_openreview_id_from_url(url: str) -> str:
     """
     if not isinstance(url, str):
         return ""
-    m = re.search(r"[?&]id=([^&]+)", url)
+    m = _OPENREVIEW_ID_RE.search(url)
     if m:
         return m.group(1).strip()
     return ""
 
 
-def extract_openreview_id_pc(openreview_urls: str) -> str:
+def extract_openreview_ids_pc(openreview_urls: pd.Series) -> pd.Series:
     """
     PaperCopilot stores OpenReview URLs as a semicolon-separated list.
-    Pick the first 'openreview.net/forum' URL and extract its id.
+    Pick the first 'openreview.net/forum' URL in each row and extract its id.
     """
-    if not isinstance(openreview_urls, str):
-        return ""
-    parts = [p.strip() for p in openreview_urls.split(";") if p.strip()]
-    for p in parts:
-        if "openreview.net/forum" in p:
-            return extract_openreview_id_from_url(p)
-    return ""
+    # Cast so .str works even when read_csv gave an all-empty (float64) column
+    urls = openreview_urls.where(openreview_urls.map(type) == str).astype("string")
+    parts = urls.str.split(";").explode().str.strip()
+    forum = parts[parts.str.contains("openreview.net/forum", regex=False, na=False)]
+    first_forum = forum.groupby(level=0).first()
+    ids = first_forum.str.extract(_OPENREVIEW_ID_RE, expand=False).str.strip()
+    return ids.reindex(openreview_urls.index).fillna("")
 
 
 def load_papercopilot(path: str) -> pd.DataFrame:
     pc = pd.read_csv(path)
-    pc["openreview_id"] = pc["openreview_urls"].map(extract_openreview_id_pc)
+    pc["openreview_id"] = extract_openreview_ids_pc(pc["openreview_urls"])
     return pc
 
 
@@ -59,84 +63,68 @@ def load_neurips_json(path: str) -> pd.DataFrame:
       - abstract
       - session/location/time info, etc.
     """
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    rows = []
-    for ev in data["results"]:
-        paper_url = ev.get("paper_url") or ""
-        openreview_id = extract_openreview_id_from_url(paper_url)
-
-        # Fallback: look in eventmedia for an OpenReview URL
-        if not openreview_id:
-            for em in ev.get("eventmedia", []) or []:
-                uri = em.get("uri")
-                if not uri:
-                    continue
-                if "openreview.net/forum" in uri:
-                    cand = extract_openreview_id_from_url(uri)
-                    if cand:
-                        openreview_id = cand
-                        break
-
-        name = ev.get("name") or ""
-
-        rows.append({
-            "neurips_id": ev.get("id"),
-            "name": name,
-            "norm_title_nj": normalize_title(name),
-            "openreview_id": openreview_id,
-            "neurips_abstract": ev.get("abstract"),          # <-- NEW
-            "neurips_event_type": ev.get("eventtype") or ev.get("event_type"),
-            "neurips_session": ev.get("session"),
-            "neurips_location": ev.get("room_name"),
-            "neurips_starttime": ev.get("starttime"),
-            "neurips_endtime": ev.get("endtime"),
-            "neurips_virtualsite_url": ev.get("virtualsite_url"),
-            "neurips_paper_url": paper_url,
-            "neurips_decision": ev.get("decision"),
-            "neurips_poster_position": ev.get("poster_position"),
-        })
-
-    nj = pd.DataFrame(rows)
+    # orjson parses the multi-MB file several times faster than json
+    with open(path, "rb") as f:
+        data = orjson.loads(f.read())
+    events = data["results"]
+
+    # Build the frame column by column rather than from a list of row dicts
+    paper_urls = pd.Series([ev.get("paper_url") or "" for ev in events])
+    openreview_ids = paper_urls.str.extract(_OPENREVIEW_ID_RE, expand=False).fillna("").str.strip()
+
+    # Fallback: look in eventmedia for an OpenReview URL
+    for i in (openreview_ids == "").to_numpy().nonzero()[0]:
+        for em in events[i].get("eventmedia", []) or []:
+            uri = em.get("uri")
+            if not uri:
+                continue
+            if "openreview.net/forum" in uri:
+                cand = extract_openreview_id_from_url(uri)
+                if cand:
+                    openreview_ids.iat[i] = cand
+                    break
+
+    names = [ev.get("name") or "" for ev in events]
+
+    nj = pd.DataFrame({
+        "neurips_id": [ev.get("id") for ev in events],
+        "name": names,
+        "norm_title_nj": normalize_titles(pd.Series(names)),
+        "openreview_id": openreview_ids,
+        "neurips_abstract": [ev.get("abstract") for ev in events],          # <-- NEW
+        "neurips_event_type": [ev.get("eventtype") or ev.get("event_type") for ev in events],
+        "neurips_session": [ev.get("session") for ev in events],
+        "neurips_location": [ev.get("room_name") for ev in events],
+        "neurips_starttime": [ev.get("starttime") for ev in events],
+        "neurips_endtime": [ev.get("endtime") for ev in events],
+        "neurips_virtualsite_url": [ev.get("virtualsite_url") for ev in events],
+        "neurips_paper_url": paper_urls,
+        "neurips_decision": [ev.get("decision") for ev in events],
+        "neurips_poster_position": [ev.get("poster_position") for ev in events],
+    })
     return nj
 
 
-def choose_group_openreview_id(series: pd.Series) -> str:
+def propagate_openreview_ids(nj: pd.DataFrame) -> pd.DataFrame:
     """
-    For a group of NeurIPS rows with the same norm_title_nj,
-    pick one canonical OpenReview ID and propagate it.
+    For each norm_title_nj, propagate a chosen OpenReview ID to all rows
+    in that group.
 
     Heuristic:
       - Prefer IDs that do NOT start with '2025-' (i.e., real OpenReview IDs)
       - If none, fall back to the first non-empty string.
     """
-    vals = [v for v in series if isinstance(v, str) and v.strip()]
-    if not vals:
-        return ""
-
-    # Prefer "clean" IDs (not starting with 2025-)
-    for v in vals:
-        if not v.startswith("2025-"):
-            return v
-    # Otherwise just use the first
-    return vals[0]
-
-
-def propagate_openreview_ids(nj: pd.DataFrame) -> pd.DataFrame:
-    """
-    For each norm_title_nj, propagate a chosen OpenReview ID to all rows
-    in that group.
-    """
-    # Compute group-level canonical IDs
-    group_ids = (
-        nj.groupby("norm_title_nj")["openreview_id"]
-        .apply(choose_group_openreview_id)
-        .to_dict()
-    )
+    # Compute group-level canonical IDs as columnar ops: among non-empty IDs,
+    # a stable sort puts clean ones first, then keep the first row per title
+    ids = nj["openreview_id"]
+    valid = (ids.map(type) == str) & (ids.astype(str).str.strip() != "")
+    candidates = nj.loc[valid, ["norm_title_nj", "openreview_id"]]
+    candidates = candidates.assign(clean=~candidates["openreview_id"].str.startswith("2025-"))
+    candidates = candidates.sort_values("clean", ascending=False, kind="stable")
+    group_ids = candidates.drop_duplicates("norm_title_nj").set_index("norm_title_nj")["openreview_id"]
 
     # Map canonical IDs back onto all rows
-    nj["openreview_id"] = nj["norm_title_nj"].map(group_ids)
+    nj["openreview_id"] = nj["norm_title_nj"].map(group_ids).fillna("")
     return nj
 
 
@@ -1,13 +1,52 @@
 """
 Scrape expo events from NeurIPS 2025 virtual schedule
 """
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import json
+import os
+import httpx
+from http_utils import get_with_backoff
+from selectolax.lexbor import LexborHTMLParser
 import pandas as pd
-import time
+import pyarrow as pa
+from pyarrow import csv as pacsv
 import re
 from datetime import datetime
 
+# Date/time text on event pages, e.g. "Tue 2 Dec 8:30 a.m. PST"
+PST_RE = re.compile(r'\d+\s+Dec.*?[ap]\.m\..*?PST', re.I)
+# Its parts: "Tue 2 Dec", hour, minute, "a.m."/"p.m."
+DATE_RE = re.compile(r'(\w+\s+\d+\s+\w+)\s+(\d+):(\d+)\s+(a\.m\.|p\.m\.)')
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+}
+# Event detail pages fetched at once (keeps the load on neurips.cc polite)
+SCRAPE_CONCURRENCY = 16
+REQUEST_TIMEOUT = 20
+
+# Output columns, in order (the schema the paper CSVs use)
+EXPO_FIELDS = [
+    'title', 'neurips_event_type', 'neurips_id', 'neurips_virtualsite_url',
+    'neurips_abstract', 'neurips_location', 'neurips_starttime', 'authors',
+    'day', 'ampm', 'session_area', 'affiliation', 'status', 'rating',
+    'avg_rating', 'openreview_urls', 'neurips_urls', 'all_urls',
+    'openreview_id', 'name', 'norm_title_nj', 'neurips_session',
+    'neurips_endtime', 'neurips_paper_url', 'neurips_decision',
+    'neurips_poster_position',
+]
+# Schema columns expo events have no value for
+EXPO_EMPTY_FIELDS = [
+    'session_area', 'affiliation', 'status', 'rating', 'avg_rating',
+    'openreview_urls', 'neurips_urls', 'all_urls', 'openreview_id', 'name',
+    'norm_title_nj', 'neurips_endtime', 'neurips_paper_url',
+    'neurips_decision', 'neurips_poster_position',
+]
+
+# Event pages from earlier runs: url -> {"etag", "last_modified", "details"}.
+# Re-runs send conditional GETs and reuse the parsed details on a 304.
+PAGE_CACHE_PATH = "data/.expo_page_cache.json"
+
 def parse_neurips_datetime(date_str):
     """Parse NeurIPS date format like 'Tue 2 Dec 8:30 a.m. PST' to ISO format"""
     if not date_str:
@@ -16,7 +55,7 @@ def parse_neurips_datetime(date_str):
     try:
         # Extract the date part: "Tue 2 Dec" and time part "8:30 a.m."
         # Format: "Tue 2 Dec 8:30 a.m. PST — 9:30 a.m. PST"
-        match = re.search(r'(\w+\s+\d+\s+\w+)\s+(\d+):(\d+)\s+(a\.m\.|p\.m\.)', date_str)
+        match = DATE_RE.search(date_str)
         if not match:
             return None, None, None
         
@@ -45,179 +84,204 @@ def parse_neurips_datetime(date_str):
         print(f"Error parsing date '{date_str}': {e}")
         return None, None, None
 
-def scrape_event_details(event_id, base_url="https://neurips.cc"):
-    """Scrape details for a single event"""
+def load_page_cache(path=PAGE_CACHE_PATH):
+    """Load the page cache; a missing or unreadable file gives an empty cache"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_page_cache(cache, path=PAGE_CACHE_PATH):
+    """Write the page cache (atomic swap)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+async def scrape_event_details(client, semaphore, event_id, page_cache, base_url="https://neurips.cc"):
+    """Scrape details for a single event (at most SCRAPE_CONCURRENCY downloads in flight)"""
     event_url = f"{base_url}/virtual/2025/{event_id}"
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-    }
+    # Revalidate a page seen on an earlier run instead of downloading it again
+    cached = page_cache.get(event_url)
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
     
     try:
-        response = requests.get(event_url, headers=headers)
+        async with semaphore:
+            response = await get_with_backoff(client, event_url, headers=headers)
+        if cached and response.status_code == 304:
+            return cached["details"]
         if response.status_code != 200:
             return None
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract description/abstract
-        abstract = ""
-        abstract_div = soup.find('div', class_=lambda x: x and 'abstract' in str(x).lower())
-        if not abstract_div:
-            abstract_div = soup.find('div', class_=lambda x: x and 'description' in str(x).lower())
-        if not abstract_div:
-            # Try to find any text content that looks like a description
-            content_div = soup.find('div', class_=lambda x: x and 'content' in str(x).lower())
-            if content_div:
-                abstract = content_div.get_text(strip=True)
-        else:
-            abstract = abstract_div.get_text(strip=True)
-        
-        # Extract time/date info - look for datetime elements
-        start_time_raw = ""
-        location = ""
-        
-        # Look for date/time text (e.g., "Tue 2 Dec 8:30 a.m. PST")
-        date_matches = soup.find_all(string=re.compile(r'\d+\s+Dec.*?[ap]\.m\..*?PST', re.I))
-        if date_matches:
-            # Get the first match and extract just the relevant part
-            full_text = date_matches[0].strip()
-            # Extract up to the em dash or take whole thing
-            start_time_raw = full_text.split('—')[0].strip() if '—' in full_text else full_text
-        
-        # Extract location
-        location_elem = soup.find(['div', 'span'], class_=lambda x: x and 'location' in str(x).lower())
-        if location_elem:
-            location = location_elem.get_text(strip=True)
-        
-        # Extract authors/presenters
-        authors = ""
-        authors_div = soup.find('div', class_=lambda x: x and ('author' in str(x).lower() or 'presenter' in str(x).lower() or 'speaker' in str(x).lower()))
-        if authors_div:
-            authors = authors_div.get_text(strip=True)
-        
-        # Parse the datetime
-        iso_time, day, ampm = parse_neurips_datetime(start_time_raw)
-        
-        return {
-            'abstract': abstract,
-            'location': location,
-            'start_time': iso_time,
-            'start_time_raw': start_time_raw,
-            'day': day,
-            'ampm': ampm,
-            'authors': authors,
-            'virtualsite_url': event_url
-        }
+        # Parsing is CPU-bound; a worker thread keeps the other downloads going
+        details = await asyncio.to_thread(parse_event_details, response.content, event_url)
+        # Only pages with validators can be revalidated later
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if etag or last_modified:
+            page_cache[event_url] = {"etag": etag, "last_modified": last_modified, "details": details}
+        return details
     except Exception as e:
         print(f"Error scraping event {event_id}: {e}")
         return None
 
-def scrape_neurips_expo_events():
-    """Scrape expo events from NeurIPS virtual schedule"""
+def find_start_time(node):
+    """Date/time text of the first text node under node matching PST_RE, or ''"""
+    for child in node.traverse(include_text=True):
+        if child.tag == '-text' and PST_RE.search(child.text_content):
+            full_text = child.text_content.strip()
+            # Extract up to the em dash or take whole thing
+            return full_text.split('—')[0].strip() if '—' in full_text else full_text
+    return ""
+
+def parse_event_details(content, event_url):
+    """Extract the details of an event from its page"""
+    # Lexbor (C) parser; class matching is done by CSS [class*=... i]
+    # selectors instead of Python callbacks on every tag
+    tree = LexborHTMLParser(content)
     
-    expo_url = "https://neurips.cc/virtual/2025/loc/san-diego/events/expo-2025"
+    # Extract time/date info - look for datetime elements
+    location = ""
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-    }
+    # Look for date/time text (e.g., "Tue 2 Dec 8:30 a.m. PST"), first in the
+    # elements that usually hold it, then in every text node (including
+    # scripts, so this runs before they are stripped)
+    for container in tree.css('time, [class*="date" i], [class*="time" i]'):
+        start_time_raw = find_start_time(container)
+        if start_time_raw:
+            break
+    else:
+        start_time_raw = find_start_time(tree.root)
     
-    print(f"Fetching expo page: {expo_url}")
-    response = requests.get(expo_url, headers=headers)
+    # Script/style contents are not page text
+    tree.strip_tags(['script', 'style'])
     
-    if response.status_code != 200:
-        print(f"Error: Got status code {response.status_code}")
-        return []
+    # Extract description/abstract
+    abstract = ""
+    abstract_div = tree.css_first('div[class*="abstract" i]')
+    if not abstract_div:
+        abstract_div = tree.css_first('div[class*="description" i]')
+    if not abstract_div:
+        # Try to find any text content that looks like a description
+        content_div = tree.css_first('div[class*="content" i]')
+        if content_div:
+            abstract = content_div.text(strip=True)
+    else:
+        abstract = abstract_div.text(strip=True)
     
-    soup = BeautifulSoup(response.content, 'html.parser')
+    # Extract location
+    location_elem = tree.css_first('div[class*="location" i], span[class*="location" i]')
+    if location_elem:
+        location = location_elem.text(strip=True)
     
-    # Find all event cards with data attributes
-    event_cards = soup.find_all('div', class_='event-card')
-    print(f"Found {len(event_cards)} event cards")
+    # Extract authors/presenters
+    authors = ""
+    authors_div = tree.css_first('div[class*="author" i], div[class*="presenter" i], div[class*="speaker" i]')
+    if authors_div:
+        authors = authors_div.text(strip=True)
     
-    events = []
-    expo_types = ['Expo Workshop', 'Expo Talk Panel', 'Expo Demonstration']
+    # Parse the datetime
+    iso_time, day, ampm = parse_neurips_datetime(start_time_raw)
     
-    for card in event_cards:
-        event_id = card.get('data-event-id')
-        event_title = card.get('data-event-title')
-        event_type = card.get('data-event-type')
-        
-        # Only process expo events
-        if not event_type or event_type not in expo_types:
-            continue
+    return {
+        'abstract': abstract,
+        'location': location,
+        'start_time': iso_time,
+        'start_time_raw': start_time_raw,
+        'day': day,
+        'ampm': ampm,
+        'authors': authors,
+        'virtualsite_url': event_url
+    }
+
+async def scrape_neurips_expo_events():
+    """Scrape expo events from NeurIPS virtual schedule"""
+    
+    expo_url = "https://neurips.cc/virtual/2025/loc/san-diego/events/expo-2025"
+    
+    semaphore = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+    limits = httpx.Limits(max_connections=SCRAPE_CONCURRENCY, max_keepalive_connections=SCRAPE_CONCURRENCY)
+    # One pooled client for the whole run: connections (and TLS sessions) to
+    # neurips.cc are kept alive and reused for every event page
+    async with httpx.AsyncClient(headers=HEADERS, limits=limits, timeout=REQUEST_TIMEOUT, follow_redirects=True) as client:
+        print(f"Fetching expo page: {expo_url}")
+        response = await get_with_backoff(client, expo_url)
         
-        if not event_id or not event_title:
-            continue
+        if response.status_code != 200:
+            print(f"Error: Got status code {response.status_code}")
+            return pd.DataFrame(columns=EXPO_FIELDS)
         
-        print(f"Processing: {event_type} - {event_title[:60]}...")
+        tree = LexborHTMLParser(response.content)
         
-        # Get detailed info
-        details = scrape_event_details(event_id)
-        time.sleep(0.5)  # Be respectful to the server
+        # Find all event cards with data attributes
+        event_cards = tree.css('div.event-card')
+        print(f"Found {len(event_cards)} event cards")
         
-        event_data = {
-            'title': event_title,
-            'neurips_event_type': event_type,
-            'neurips_id': event_id,
-            'neurips_virtualsite_url': f'https://neurips.cc/virtual/2025/{event_id}'
-        }
+        expo_types = ['Expo Workshop', 'Expo Talk Panel', 'Expo Demonstration']
         
-        if details:
-            event_data.update({
-                'neurips_abstract': details.get('abstract', ''),
-                'neurips_location': details.get('location', ''),
-                'neurips_starttime': details.get('start_time', ''),
-                'authors': details.get('authors', ''),
-            })
+        cards = []
+        for card in event_cards:
+            event_id = card.attributes.get('data-event-id')
+            event_title = card.attributes.get('data-event-title')
+            event_type = card.attributes.get('data-event-type')
             
-            # Add day and ampm for filtering
-            if details.get('day'):
-                event_data['day'] = details['day']
-                event_data['ampm'] = details.get('ampm', '')
-        else:
-            event_data.update({
-                'neurips_abstract': '',
-                'neurips_location': '',
-                'neurips_starttime': '',
-                'authors': '',
-            })
-        
-        # Add default/empty fields to match schema
-        event_data.update({
-            'session_area': '',
-            'affiliation': '',
-            'status': '',
-            'rating': '',
-            'avg_rating': '',
-            'openreview_urls': '',
-            'neurips_urls': '',
-            'all_urls': '',
-            'openreview_id': '',
-            'name': '',
-            'norm_title_nj': '',
-            'neurips_session': event_type,
-            'neurips_endtime': '',
-            'neurips_paper_url': '',
-            'neurips_decision': '',
-            'neurips_poster_position': ''
-        })
+            # Only process expo events
+            if not event_type or event_type not in expo_types:
+                continue
+            
+            if not event_id or not event_title:
+                continue
+            
+            cards.append((event_id, event_title, event_type))
+        print(f"Fetching details for {len(cards)} expo events")
         
-        events.append(event_data)
+        # Get detailed info for all events concurrently (bounded by the semaphore)
+        page_cache = load_page_cache()
+        all_details = await asyncio.gather(*(
+            scrape_event_details(client, semaphore, event_id, page_cache) for event_id, _, _ in cards
+        ))
+        save_page_cache(page_cache)
+    
+    # One list per output column, filled in event order
+    columns = {field: [] for field in EXPO_FIELDS}
+    for (event_id, event_title, event_type), details in zip(cards, all_details):
+        details = details or {}
+        columns['title'].append(event_title)
+        columns['neurips_event_type'].append(event_type)
+        columns['neurips_id'].append(event_id)
+        columns['neurips_virtualsite_url'].append(f'https://neurips.cc/virtual/2025/{event_id}')
+        columns['neurips_abstract'].append(details.get('abstract', ''))
+        columns['neurips_location'].append(details.get('location', ''))
+        columns['neurips_starttime'].append(details.get('start_time', ''))
+        columns['authors'].append(details.get('authors', ''))
+        # Day and ampm for filtering
+        columns['day'].append(details.get('day') or '')
+        columns['ampm'].append(details.get('ampm', '') if details.get('day') else '')
+        columns['neurips_session'].append(event_type)
+    
+    # Default/empty fields to match schema
+    for field in EXPO_EMPTY_FIELDS:
+        columns[field] = [''] * len(cards)
     
-    return events
+    return pd.DataFrame(columns, columns=EXPO_FIELDS)
 
 def main():
     print("Starting NeurIPS Expo Events Scraper")
     print("=" * 60)
     
-    events = scrape_neurips_expo_events()
+    df = asyncio.run(scrape_neurips_expo_events())
     
-    if events:
-        df = pd.DataFrame(events)
+    if not df.empty:
         output_path = 'data/neurips_2025_expo_events.csv'
-        df.to_csv(output_path, index=False)
-        print(f"\n✓ Saved {len(events)} expo events to {output_path}")
+        # Stays CSV (ingest and rag read it); pyarrow's writer is native code
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), output_path)
+        print(f"\n✓ Saved {len(df)} expo events to {output_path}")
         
         # Show breakdown by type
         print("\nEvent breakdown:")
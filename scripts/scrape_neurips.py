@@ -1,238 +1,134 @@
 #!/usr/bin/env python3
 """
-DEPRECATED - download the JSON instead
-
-
 Enrich PaperCopilot NeurIPS 2025 CSV with NeurIPS paper URLs and session info.
 
 Inputs:
   - papercopilot_neurips2025_raw.csv (from your Selenium scraper)
     columns: title, session_area, authors, affiliation, status, rating,
              avg_rating, openreview_urls, neurips_urls, all_urls
+  - neurips_2025.json, the NeurIPS events export (the same file
+    merge_neurips.py reads)
 
 Process:
-  1. Scrape https://neurips.cc/virtual/2025/loc/san-diego/papers.html
-     to get (title, neurips_paper_url).
-  2. For each NeurIPS paper URL, scrape the page to get:
+  1. Read the export and keep the San Diego events, with:
+       - neurips_paper_url / neurips_id
        - presentation_type (e.g. "San Diego Poster", "San Diego Oral")
        - location (e.g. "Exhibit Hall C,D,E #2504")
-       - datetime_raw (e.g. "Fri 5 Dec 4:30 p.m. PST — 7:30 p.m. PST")
-  3. Join by normalized title with the PaperCopilot CSV.
+       - datetime_raw (start time, e.g. "2025-12-05T16:30:00-08:00")
+  2. Join by normalized title with the PaperCopilot CSV.
+
+This used to scrape papers.html and then every paper page (thousands of
+requests); the export has the same fields in one file.
 
 Output:
   - papercopilot_neurips2025_enriched.csv
 """
 
-import csv
+import os
 import re
-import time
-from typing import Dict, Tuple
 
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+import orjson
+import pandas as pd
 
 INPUT_CSV = "papercopilot_neurips2025_raw.csv"
+NEURIPS_JSON = "neurips_2025.json"
 OUTPUT_CSV = "papercopilot_neurips2025_enriched.csv"
 
-NEURIPS_PAPERS_URL = "https://neurips.cc/virtual/2025/loc/san-diego/papers.html"
-
-HEADERS = {
-    "User-Agent": "NeurIPS-2025-Schedule-Joiner (contact: your-email@example.com)"
-}
-REQUEST_TIMEOUT = 20
-SLEEP_BETWEEN_REQUESTS = 0.3  # be polite
-
-
-session = requests.Session()
-session.headers.update(HEADERS)
+NEURIPS_BASE_URL = "https://neurips.cc"
 
+WS_RE = re.compile(r"\s+")
+NONALNUM_RE = re.compile(r"[^a-z0-9 ]")
 
-def fetch(url: str) -> str:
-    resp = session.get(url, timeout=REQUEST_TIMEOUT)
-    resp.raise_for_status()
-    return resp.text
 
-
-def norm_title(title: str) -> str:
-    """Normalize title for matching across sources."""
-    t = title.lower()
-    t = re.sub(r"\s+", " ", t)
-    t = re.sub(r"[^a-z0-9 ]", "", t)
-    return t.strip()
+def norm_titles(titles: pd.Series) -> pd.Series:
+    """Normalize titles for matching across sources."""
+    return (
+        titles.str.lower()
+        .str.replace(WS_RE, " ", regex=True)
+        .str.replace(NONALNUM_RE, "", regex=True)
+        .str.strip()
+    )
 
 
 # ---------- STEP 1: Read your existing CSV ----------
 
-def load_papercopilot_csv(path: str):
-    rows = []
-    by_norm_title: Dict[str, dict] = {}
-    with open(path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # ensure all expected keys exist
-            for k in [
-                "title",
-                "session_area",
-                "authors",
-                "affiliation",
-                "status",
-                "rating",
-                "avg_rating",
-                "openreview_urls",
-                "neurips_urls",
-                "all_urls",
-            ]:
-                if k not in row:
-                    row.setdefault(k, "")
-            t = row["title"].strip()
-            row["norm_title"] = norm_title(t)
-            rows.append(row)
-            by_norm_title[row["norm_title"]] = row
-    return rows, by_norm_title
-
-
-# ---------- STEP 2: Scrape NeurIPS index (title -> URL) ----------
-
-def scrape_neurips_index() -> Dict[str, str]:
+def load_papercopilot_csv(path: str) -> pd.DataFrame:
+    # Everything stays text, with "" for empty cells
+    df = pd.read_csv(path, dtype=str, keep_default_na=False).fillna("")
+    # ensure all expected columns exist
+    for k in [
+        "title",
+        "session_area",
+        "authors",
+        "affiliation",
+        "status",
+        "rating",
+        "avg_rating",
+        "openreview_urls",
+        "neurips_urls",
+        "all_urls",
+    ]:
+        if k not in df.columns:
+            df[k] = ""
+    df["norm_title"] = norm_titles(df["title"])
+    return df
+
+
+# ---------- STEP 2: NeurIPS session info from the export ----------
+
+def load_neurips_metadata(path: str) -> pd.DataFrame:
     """
-    Return mapping: norm_title -> neurips_paper_url for San Diego papers.
+    Return the San Diego events of the NeurIPS export, indexed by norm_title,
+    with columns neurips_paper_url, neurips_id, presentation_type,
+    neurips_location and neurips_datetime_raw.
     """
-    html = fetch(NEURIPS_PAPERS_URL)
-    soup = BeautifulSoup(html, "html.parser")
-
-    mapping: Dict[str, str] = {}
-
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        # Filter to San Diego poster/oral/talk pages
-        if "/virtual/2025/loc/san-diego/" in href and (
-            "/poster/" in href or "/oral/" in href or "/talk/" in href
-        ):
-            title = a.get_text(strip=True)
-            if not title:
-                continue
-            url = urljoin("https://neurips.cc", href)
-            nt = norm_title(title)
-            # If duplicates happen, last one wins; in practice titles should be unique here
-            mapping[nt] = url
-
-    print(f"[NeurIPS index] Found {len(mapping)} unique titles with URLs")
-    return mapping
-
-
-# ---------- STEP 3: Scrape each NeurIPS paper page ----------
-
-def parse_neurips_paper_page(url: str) -> Tuple[str, str, str]:
-    """
-    Parse a NeurIPS poster/oral page.
-
-    Returns (presentation_type, location, datetime_raw).
-    Example page (poster):
-      - "###  San Diego Poster"
-      - "##  Coloring Learning for Heterophilic Graph Representation"
-      - "##### Exhibit Hall C,D,E #2504"
-      - "Fri 5 Dec 4:30 p.m. PST — 7:30 p.m. PST"
-    """
-    try:
-        html = fetch(url)
-    except Exception as e:
-        print(f"[WARN] Failed to fetch NeurIPS page {url}: {e}")
-        return "", "", ""
-
-    soup = BeautifulSoup(html, "html.parser")
-
-    # Presentation type: look for heading containing "Poster", "Oral", "Talk"
-    presentation_type = ""
-    for h in soup.find_all(["h3", "h4"]):
-        txt = h.get_text(" ", strip=True)
-        if any(word in txt for word in ["Poster", "Oral", "Talk"]):
-            presentation_type = txt
-            break
-
-    # Location: the "Exhibit Hall..." line (or a Room)
-    location = ""
-    # Date/time: line that contains timezone & an em dash or hyphen
-    datetime_raw = ""
-
-    for tag in soup.find_all(["h5", "h6", "p", "span"]):
-        txt = tag.get_text(" ", strip=True)
-        if not txt:
-            continue
-        if any(k in txt for k in ["Exhibit Hall", "Room", "#"]):
-            if not location:
-                location = txt
-        if any(tz in txt for tz in ["PST", "PDT"]) and ("—" in txt or "-" in txt):
-            if not datetime_raw:
-                datetime_raw = txt
-
-    return presentation_type, location, datetime_raw
-
-
-def build_neurips_metadata(neurips_index: Dict[str, str]) -> Dict[str, dict]:
-    """
-    For each (norm_title -> url) in the NeurIPS index, fetch session info.
-
-    Returns: norm_title -> {
-        'neurips_paper_url': ...,
-        'neurips_id': ...,
-        'presentation_type': ...,
-        'location': ...,
-        'datetime_raw': ...
-    }
-    """
-    meta: Dict[str, dict] = {}
-    for nt, url in neurips_index.items():
-        # extract numeric id if present
-        m = re.search(r"/(poster|oral|talk)/(\d+)", url)
-        neurips_id = m.group(2) if m else ""
-
-        presentation_type, location, datetime_raw = parse_neurips_paper_page(url)
-
-        meta[nt] = {
-            "neurips_paper_url": url,
-            "neurips_id": neurips_id,
-            "presentation_type": presentation_type,
-            "location": location,
-            "datetime_raw": datetime_raw,
-        }
-
-        time.sleep(SLEEP_BETWEEN_REQUESTS)
-
-    print(f"[NeurIPS detail] Built metadata for {len(meta)} titles")
+    with open(path, "rb") as f:
+        events = orjson.loads(f.read())["results"]
+
+    def field(key):
+        return pd.Series([ev.get(key) or "" for ev in events], dtype=str)
+
+    event_type = field("event_type")
+    session = field("session")
+    # event_type is a template like "{location} Poster" for most events
+    mexico_city = event_type.str.contains("Mexico City", regex=False) | session.str.startswith("Mexico City")
+    poster_position = field("poster_position")
+    meta = pd.DataFrame({
+        "norm_title": norm_titles(field("name")),
+        "neurips_paper_url": NEURIPS_BASE_URL + field("virtualsite_url"),
+        "neurips_id": field("id"),
+        "presentation_type": event_type.str.replace("{location}", "San Diego", regex=False),
+        "neurips_location": (field("room_name") + " " + poster_position).str.strip(),
+        "neurips_datetime_raw": field("starttime"),
+    })[~mexico_city]
+    # If a title repeats, the last event wins
+    meta = meta[meta["norm_title"] != ""].drop_duplicates("norm_title", keep="last").set_index("norm_title")
+    print(f"[NeurIPS export] Found {len(meta)} unique San Diego titles")
     return meta
 
 
-# ---------- STEP 4: Join and write out ----------
+# ---------- STEP 3: Join and write out ----------
 
 def main():
-    print(f"Loading PaperCopilot CSV: {INPUT_CSV}")
-    rows, pc_by_title = load_papercopilot_csv(INPUT_CSV)
-    print(f"Loaded {len(rows)} rows from PaperCopilot")
+    if not os.path.exists(NEURIPS_JSON):
+        print(f"{NEURIPS_JSON} not found - download the NeurIPS 2025 events JSON first.")
+        return
 
-    print("Scraping NeurIPS index (San Diego)...")
-    neurips_index = scrape_neurips_index()
+    print(f"Loading PaperCopilot CSV: {INPUT_CSV}")
+    df = load_papercopilot_csv(INPUT_CSV)
+    print(f"Loaded {len(df)} rows from PaperCopilot")
 
-    print("Scraping per-paper NeurIPS pages for session info...")
-    neurips_meta = build_neurips_metadata(neurips_index)
+    print(f"Loading NeurIPS export: {NEURIPS_JSON}")
+    meta_df = load_neurips_metadata(NEURIPS_JSON)
 
-    # Add new columns to each row
-    for row in rows:
-        nt = row["norm_title"]
-        meta = neurips_meta.get(nt, {})
-        row["neurips_paper_url"] = meta.get("neurips_paper_url", "")
-        row["neurips_id"] = meta.get("neurips_id", "")
-        row["presentation_type"] = meta.get("presentation_type", "")
-        row["neurips_location"] = meta.get("location", "")
-        row["neurips_datetime_raw"] = meta.get("datetime_raw", "")
+    # Add the new columns with one left join on the normalized title
+    df = df.drop(columns=list(meta_df.columns), errors="ignore")
+    df = df.merge(meta_df, left_on="norm_title", right_index=True, how="left")
+    df[list(meta_df.columns)] = df[list(meta_df.columns)].fillna("")
 
     # Write out
-    fieldnames = list(rows[0].keys())
     print(f"Writing enriched CSV: {OUTPUT_CSV}")
-    with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
+    df.to_csv(OUTPUT_CSV, index=False)
 
     print("Done.")
 
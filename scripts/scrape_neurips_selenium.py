@@ -10,16 +10,18 @@ in the DOM at a time), this script uses the official NeurIPS Downloads export:
     https://neurips.cc/Downloads/2025
 
 Steps:
-  1. Open Downloads 2025 with Selenium (using your logged-in Chrome profile).
-  2. Click the "csv" link under "Format".
-  3. Wait for a CSV file to be downloaded to a known folder.
-  4. Parse the CSV with pandas to get all events (posters, orals, etc.).
-  5. Build an index:
+  1. Download the CSV export with a direct HTTP request (the same form POST
+     as download_data_requests.py). With --use-selenium, instead open
+     Downloads 2025 in Chrome (using your logged-in profile), click the "csv"
+     link under "Format" and wait for the file to land in a known folder.
+  2. Parse the CSV with pandas to get all events (posters, orals, etc.).
+  3. Build an index:
         norm_title -> {neurips_id, event_type, location, start_time, raw_row}
-  6. Save as a CSV you can join with the PaperCopilot CSV on `norm_title`.
+  4. Save as a CSV you can join with the PaperCopilot CSV on `norm_title`.
 """
 
 import os
+import re
 import time
 import glob
 import argparse
@@ -27,15 +29,23 @@ import unicodedata
 from typing import Dict, Any
 
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+
+from download_data_requests import download_csv
 
 
 NEURIPS_DOWNLOADS_URL = "https://neurips.cc/Downloads/2025"
 
+WS_RE = re.compile(r"\s+")
+
+# Output column -> substrings to look for in the CSV's column names, in priority order
+COLUMN_KEYS = {
+    "raw_title": ["title", "name", "event name"],
+    "neurips_id": ["event id", "id", "eventid"],
+    "event_type": ["event type", "type", "session type"],
+    "neurips_location": ["location", "room"],
+    "neurips_datetime_raw": ["start time", "start", "date"],
+}
+
 
 # ---------- Utilities ----------
 
@@ -49,6 +59,12 @@ def normalize_title(t: str) -> str:
     return t
 
 
+def normalize_titles(titles: pd.Series) -> pd.Series:
+    """Vectorized normalize_title for a column of strings."""
+    titles = titles.str.normalize("NFKC").str.replace("\n", " ", regex=False).str.strip().str.lower()
+    return titles.str.replace(WS_RE, " ", regex=True).fillna("")
+
+
 def latest_file(directory: str, pattern: str = "*.csv") -> str:
     files = glob.glob(os.path.join(directory, pattern))
     if not files:
@@ -56,13 +72,16 @@ def latest_file(directory: str, pattern: str = "*.csv") -> str:
     return max(files, key=os.path.getmtime)
 
 
-# ---------- Selenium setup ----------
+# ---------- Selenium setup (only used with --use-selenium) ----------
 
-def create_driver(download_dir: str, chrome_binary: str = None, driver_path: str = "chromedriver") -> webdriver.Chrome:
+def create_driver(download_dir: str, chrome_binary: str = None, driver_path: str = "chromedriver"):
     """
     Creates a Chrome WebDriver that automatically downloads files to `download_dir`
     without prompting.
     """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
     os.makedirs(download_dir, exist_ok=True)
 
     options = webdriver.ChromeOptions()
@@ -90,11 +109,15 @@ def create_driver(download_dir: str, chrome_binary: str = None, driver_path: str
 
 # ---------- Main logic ----------
 
-def download_neurips_csv(driver: webdriver.Chrome, download_dir: str, timeout: int = 120) -> str:
+def download_neurips_csv(driver, download_dir: str, timeout: int = 120) -> str:
     """
     Open Downloads 2025 page, click the 'csv' export, wait for a CSV to appear
     in `download_dir`, and return its path.
     """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     print(f"Opening {NEURIPS_DOWNLOADS_URL} ...")
     driver.get(NEURIPS_DOWNLOADS_URL)
 
@@ -155,80 +178,21 @@ def build_title_index_from_csv(csv_path: str) -> pd.DataFrame:
     df = pd.read_csv(csv_path)
     print("CSV columns:", df.columns.tolist())
 
-    cols_lower = {c.lower(): c for c in df.columns}
-
-    # Heuristic: find title/name column
-    title_col = None
-    for key in ["title", "name", "event name"]:
-        for c in df.columns:
-            if key in c.lower():
-                title_col = c
-                break
-        if title_col:
-            break
-    if not title_col:
+    # Lower-case each column name once, keeping the CSV's column order
+    lowered = [(c.lower(), c) for c in df.columns]
+    found = {
+        field: next((c for key in keys for lc, c in lowered if key in lc), None)
+        for field, keys in COLUMN_KEYS.items()
+    }
+    if not found["raw_title"]:
         raise RuntimeError("Could not infer title column from CSV")
 
-    # Heuristic: ID column
-    id_col = None
-    for key in ["event id", "id", "eventid"]:
-        for c in df.columns:
-            if key in c.lower():
-                id_col = c
-                break
-        if id_col:
-            break
-
-    # Heuristic: event type (Poster, Oral, etc.)
-    type_col = None
-    for key in ["event type", "type", "session type"]:
-        for c in df.columns:
-            if key in c.lower():
-                type_col = c
-                break
-        if type_col:
-            break
-
-    # Heuristic: location
-    loc_col = None
-    for key in ["location", "room"]:
-        for c in df.columns:
-            if key in c.lower():
-                loc_col = c
-                break
-        if loc_col:
-            break
-
-    # Heuristic: start time
-    start_col = None
-    for key in ["start time", "start", "date"]:
-        for c in df.columns:
-            if key in c.lower():
-                start_col = c
-                break
-        if start_col:
-            break
-
     # Build index
     out = pd.DataFrame()
-    out["raw_title"] = df[title_col].astype(str)
-    out["norm_title"] = out["raw_title"].map(normalize_title)
-    if id_col:
-        out["neurips_id"] = df[id_col]
-    else:
-        out["neurips_id"] = None
-    if type_col:
-        out["event_type"] = df[type_col]
-    else:
-        out["event_type"] = None
-    if loc_col:
-        out["neurips_location"] = df[loc_col]
-    else:
-        out["neurips_location"] = None
-    if start_col:
-        out["neurips_datetime_raw"] = df[start_col]
-    else:
-        out["neurips_datetime_raw"] = None
+    out["raw_title"] = df[found["raw_title"]].astype(str)
+    out["norm_title"] = normalize_titles(out["raw_title"])
+    for field in ["neurips_id", "event_type", "neurips_location", "neurips_datetime_raw"]:
+        out[field] = df[found[field]] if found[field] else None
 
     # Optionally filter to main-conference stuff (e.g. Posters / Orals in San Diego)
     # You can tweak this depending on how broad you want the mapping.
@@ -245,7 +209,7 @@ def main():
         "--download-dir",
         type=str,
         default="./neurips_downloads",
-        help="Directory where Chrome will download the NeurIPS CSV",
+        help="Directory where the NeurIPS CSV is downloaded",
     )
     parser.add_argument(
         "--output-csv",
@@ -265,17 +229,28 @@ def main():
         default=None,
         help="Path to Chrome binary (if needed)",
     )
+    parser.add_argument(
+        "--use-selenium",
+        action="store_true",
+        help="Drive Chrome to click the export link instead of a direct HTTP download",
+    )
     args = parser.parse_args()
 
-    driver = create_driver(
-        download_dir=args.download_dir,
-        chrome_binary=args.chrome_binary,
-        driver_path=args.chromedriver,
-    )
-    try:
-        csv_path = download_neurips_csv(driver, args.download_dir)
-    finally:
-        driver.quit()
+    if args.use_selenium:
+        driver = create_driver(
+            download_dir=args.download_dir,
+            chrome_binary=args.chrome_binary,
+            driver_path=args.chromedriver,
+        )
+        try:
+            csv_path = download_neurips_csv(driver, args.download_dir)
+        finally:
+            driver.quit()
+    else:
+        os.makedirs(args.download_dir, exist_ok=True)
+        csv_path = download_csv(os.path.join(args.download_dir, "neurips_2025_schedule.csv"))
+        if not csv_path:
+            raise RuntimeError("Direct CSV download failed; retry with --use-selenium")
 
     index_df = build_title_index_from_csv(csv_path)
     print(f"Writing {len(index_df)} rows to {args.output_csv}")
@@ -19,10 +19,11 @@ Outputs a CSV with one row per paper, including:
 """
 
 import csv
-import time
-from dataclasses import dataclass, asdict
+import os
+from dataclasses import dataclass, fields
+from operator import attrgetter
 from tqdm import tqdm
-from typing import List, Dict
+from typing import Dict, Iterator, List
 import re
 from urllib.parse import urlparse
 
@@ -32,14 +33,18 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import ElementClickInterceptedException
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
 
 
 URL = "https://papercopilot.com/paper-list/neurips-paper-list/neurips-2025-paper-list/"
 OUTPUT_CSV = "papercopilot_neurips2025_raw.csv"
 
 
-@dataclass
+@dataclass(slots=True)
 class PaperRow:
     title: str = ""
     session_area: str = ""
@@ -53,6 +58,11 @@ class PaperRow:
     all_urls: str = ""
 
 
+# CSV header, and a getter returning a row's values in that order
+PAPER_FIELDS = [field.name for field in fields(PaperRow)]
+paper_values = attrgetter(*PAPER_FIELDS)
+
+
 def setup_driver(headless: bool = False):
     """Create a Chrome WebDriver (non-headless by default so you can interact)."""
     options = webdriver.ChromeOptions()
@@ -60,53 +70,158 @@ def setup_driver(headless: bool = False):
         options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
+    # Only the table matters: skip images and extensions, and hand control back
+    # at DOMContentLoaded (the waits in main/scrape_table cover the rest)
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--disable-extensions")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    options.page_load_strategy = "eager"
     driver = webdriver.Chrome(
         service=ChromeService(ChromeDriverManager().install()),
         options=options,
     )
+    # No implicit wait: lookups return what is in the DOM right away, and the
+    # explicit WebDriverWaits are the only places that wait
+    driver.implicitly_wait(0)
     return driver
 
 
-def extract_urls_from_row(row_element) -> (List[str], List[str], List[str]):
+# NeurIPS hosts in a URL (one scan instead of two substring tests)
+NEURIPS_HOST_RE = re.compile(r"neurips\.cc|nips\.cc")
+
+# Host name clean-up for the affiliation fallback
+WWW_RE = re.compile(r"^www\.")
+SEP_RE = re.compile(r"[-_]")
+
+# Tooltip attributes where Paper Copilot puts affiliation names
+TOOLTIP_ATTRS = ["data-bs-original-title", "data-original-title", "title", "aria-label"]
+
+# Dumps the whole table in one WebDriver round-trip instead of one call per
+# cell/anchor/attribute. Picks the table mentioning the column labels (else
+# the first one) and returns, per <tr>, its th/td cells and anchor hrefs.
+TABLE_JS = """
+const tooltipAttrs = arguments[0];
+const tables = Array.from(document.querySelectorAll('table'));
+if (!tables.length) return null;
+let table = tables.find(t => {
+    const txt = t.innerText;
+    return txt.includes('Title') && txt.includes('Session/Area') && txt.includes('Authors');
+});
+const found = table !== undefined;
+if (!found) table = tables[0];
+const attrs = el => Object.fromEntries(tooltipAttrs.map(name => [name, el.getAttribute(name)]));
+const rows = Array.from(table.querySelectorAll('tr')).map(tr => ({
+    hrefs: Array.from(tr.querySelectorAll('a')).map(a => a.href),
+    cells: Array.from(tr.querySelectorAll('th, td')).map(cell => ({
+        tag: cell.tagName.toLowerCase(),
+        text: cell.innerText,
+        attrs: attrs(cell),
+        anchors: Array.from(cell.querySelectorAll('a')).map(a => ({
+            href: a.href,
+            text: a.innerText,
+            attrs: attrs(a),
+        })),
+    })),
+}));
+return {n_tables: tables.length, found: found, rows: rows};
+"""
+
+
+# "Click to Fetch All" button above the table
+FETCH_ALL_XPATH = "//*[self::button or self::a][contains(normalize-space(.), 'Fetch All')]"
+
+# Record count under the table, e.g. "Loaded 6,241 of 6,241" or "6241 / 6241"
+LOAD_STATUS_RE = re.compile(r"(\d[\d,]*)\s*(?:of|/)\s*(\d[\d,]*)")
+
+# Text of the first element after the main table (or after one of its
+# ancestors) that looks like a record count, or null
+LOAD_STATUS_JS = """
+const tables = Array.from(document.querySelectorAll('table'));
+if (!tables.length) return null;
+let node = tables.find(t => {
+    const txt = t.innerText;
+    return txt.includes('Title') && txt.includes('Session/Area') && txt.includes('Authors');
+}) || tables[0];
+const countRe = /\\d[\\d,]*\\s*(?:of|\\/)\\s*\\d[\\d,]*/;
+for (; node; node = node.parentElement) {
+    for (let sib = node.nextElementSibling; sib; sib = sib.nextElementSibling) {
+        if (countRe.test(sib.innerText)) return sib.innerText;
+    }
+}
+return null;
+"""
+
+
+def load_status(driver):
+    """(loaded, total) from the record count under the table, or None."""
+    text = driver.execute_script(LOAD_STATUS_JS)
+    m = LOAD_STATUS_RE.search(text or "")
+    if not m:
+        return None
+    return int(m.group(1).replace(",", "")), int(m.group(2).replace(",", ""))
+
+
+def all_loaded(status) -> bool:
+    return bool(status) and 0 < status[1] <= status[0]
+
+
+def wait_for_all_rows_loaded(driver, timeout: int = 600):
     """
-    Extract all URLs from the row, and classify openreview vs neurips vs others.
+    Click "Click to Fetch All" once, then wait until the record count under
+    the table says everything is loaded. Raises TimeoutException if the button
+    never becomes clickable or the count isn't complete after `timeout` seconds.
+    """
+    # Only poll afterwards: clicking again while rows stream in would restart the fetch
+    if not all_loaded(load_status(driver)):
+        button = WebDriverWait(driver, 40, ignored_exceptions=(StaleElementReferenceException,)).until(
+            EC.element_to_be_clickable((By.XPATH, FETCH_ALL_XPATH))
+        )
+        try:
+            button.click()
+        except ElementClickInterceptedException:
+            driver.execute_script("arguments[0].click();", button)
+
+    def complete_status(d):
+        status = load_status(d)
+        return status if all_loaded(status) else None
+
+    status = WebDriverWait(
+        driver, timeout, poll_frequency=1, ignored_exceptions=(StaleElementReferenceException,)
+    ).until(complete_status)
+    print("Loaded {} of {} records".format(*status))
+
+
+def unique(seq):
+    """Deduplicate while preserving order."""
+    return list(dict.fromkeys(seq))
+
+
+def extract_urls_from_row(hrefs: List[str]) -> (List[str], List[str], List[str]):
+    """
+    Classify a row's anchor hrefs as openreview vs neurips vs others.
     """
     all_urls = []
     openreview_urls = []
     neurips_urls = []
 
-    anchors = row_element.find_elements(By.TAG_NAME, "a")
-    for a in anchors:
-        href = a.get_attribute("href")
+    for href in hrefs:
         if not href:
             continue
         all_urls.append(href)
         if "openreview.net" in href:
             openreview_urls.append(href)
-        if "neurips.cc" in href or "nips.cc" in href:
+        if NEURIPS_HOST_RE.search(href):
             neurips_urls.append(href)
 
-    # Deduplicate while preserving order
-    def unique(seq):
-        seen = set()
-        out = []
-        for x in seq:
-            if x in seen:
-                continue
-            seen.add(x)
-            out.append(x)
-        return out
-
-    all_urls = unique(all_urls)
-    openreview_urls = unique(openreview_urls)
-    neurips_urls = unique(neurips_urls)
+    return unique(openreview_urls), unique(neurips_urls), unique(all_urls)
 
-    return openreview_urls, neurips_urls, all_urls
 
-
-def extract_affiliation_from_cell(cell) -> str:
+def extract_affiliation_from_cell(cell: Dict) -> str:
     """
-    Extract affiliation text from the affiliation <td>.
+    Extract affiliation text from the affiliation cell, as dumped by TABLE_JS.
 
     Strategy:
     1. Look at <a> children inside the cell (this is where Paper Copilot puts orgs).
@@ -117,35 +232,24 @@ def extract_affiliation_from_cell(cell) -> str:
     """
     candidates = []
 
-    anchors = cell.find_elements(By.TAG_NAME, "a")
+    anchors = cell["anchors"]
 
     # 1) Tooltip attributes / visible text on anchors
     for a in anchors:
-        for attr in ["data-bs-original-title", "data-original-title", "title", "aria-label"]:
-            val = a.get_attribute(attr)
+        for attr in TOOLTIP_ATTRS:
+            val = a["attrs"].get(attr)
             if val and val.strip() and val.strip() != "-":
                 candidates.append(val.strip())
-        txt = (a.text or "").strip()
+        txt = (a["text"] or "").strip()
         if txt and txt != "-":
             candidates.append(txt)
 
     # 2) Tooltip attributes on the cell itself (just in case)
-    for attr in ["data-bs-original-title", "data-original-title", "title", "aria-label"]:
-        val = cell.get_attribute(attr)
+    for attr in TOOLTIP_ATTRS:
+        val = cell["attrs"].get(attr)
         if val and val.strip() and val.strip() != "-":
             candidates.append(val.strip())
 
-    # Deduplicate while preserving order
-    def unique(seq):
-        seen = set()
-        out = []
-        for x in seq:
-            if x in seen:
-                continue
-            seen.add(x)
-            out.append(x)
-        return out
-
     candidates = unique(candidates)
 
     if candidates:
@@ -154,17 +258,17 @@ def extract_affiliation_from_cell(cell) -> str:
     # 3) Fallback: derive names from domains in hrefs (better than empty)
     domain_names = []
     for a in anchors:
-        href = a.get_attribute("href") or ""
+        href = a["href"] or ""
         if not href:
             continue
         host = urlparse(href).netloc  # e.g. 'www.tsinghua.edu.cn'
         if not host:
             continue
-        host = re.sub(r"^www\.", "", host)  # 'tsinghua.edu.cn'
+        host = WWW_RE.sub("", host)  # 'tsinghua.edu.cn'
         base = host.split(".")[0]  # crude: 'tsinghua'
         if not base:
             continue
-        base = re.sub(r"[-_]", " ", base)
+        base = SEP_RE.sub(" ", base)
         base = " ".join(w.capitalize() for w in base.split())
         domain_names.append(base)
 
@@ -173,45 +277,34 @@ def extract_affiliation_from_cell(cell) -> str:
         return "; ".join(domain_names)
 
     # 4) Last resort: visible text (which is probably just "-")
-    txt = (cell.text or "").strip()
+    txt = (cell["text"] or "").strip()
     if txt and txt != "-":
         return txt
 
     return ""
 
 
-def scrape_table(driver) -> List[PaperRow]:
+def scrape_table(driver) -> Iterator[PaperRow]:
     """
-    Parse the NeurIPS 2025 table on Paper Copilot.
+    Parse the NeurIPS 2025 table on Paper Copilot, yielding one PaperRow per paper.
 
-    - Finds the main table
+    - Dumps the main table (the one mentioning the column labels) with TABLE_JS
     - Locates the header row by looking for "Title", "Session/Area", "Authors"
     - Uses that row as header; all following rows are treated as data
     """
 
-    wait = WebDriverWait(driver, 40)
-
     # Wait for at least one table to be present
-    wait.until(EC.presence_of_element_located((By.XPATH, "//table")))
-    tables = driver.find_elements(By.XPATH, "//table")
-    print(f"Found {len(tables)} <table> elements")
+    WebDriverWait(driver, 40).until(EC.presence_of_element_located((By.XPATH, "//table")))
+    dump = driver.execute_script(TABLE_JS, TOOLTIP_ATTRS)
 
-    if not tables:
+    if not dump:
         raise RuntimeError("No <table> elements found at all")
+    print(f"Found {dump['n_tables']} <table> elements")
 
-    # Choose the table whose text mentions the column labels
-    main_table = None
-    for t in tables:
-        txt = t.text
-        if "Title" in txt and "Session/Area" in txt and "Authors" in txt:
-            main_table = t
-            break
-
-    if main_table is None:
+    if not dump["found"]:
         print("WARNING: Could not find table containing Title/Session/Area/Authors; using first table.")
-        main_table = tables[0]
 
-    rows = main_table.find_elements(By.XPATH, ".//tr")
+    rows = dump["rows"]
     print(f"Table has {len(rows)} <tr> rows")
 
     if len(rows) < 2:
@@ -223,8 +316,7 @@ def scrape_table(driver) -> List[PaperRow]:
     header_idx_in_rows = None
 
     for i, r in enumerate(rows):
-        cells = r.find_elements(By.XPATH, ".//th|.//td")
-        cell_texts = [c.text.strip() for c in cells if c.text.strip()]
+        cell_texts = [c["text"].strip() for c in r["cells"] if c["text"].strip()]
         joined = " ".join(cell_texts)
         if "Title" in joined and "Session/Area" in joined and "Authors" in joined:
             header_row = r
@@ -236,14 +328,14 @@ def scrape_table(driver) -> List[PaperRow]:
         header_row = rows[0]
         header_idx_in_rows = 0
 
-    header_cells = header_row.find_elements(By.XPATH, ".//th|.//td")
+    header_cells = header_row["cells"]
 
     def normalize_header(text: str) -> str:
         return text.strip().lower()
 
     header_index: Dict[str, int] = {}
     for idx, cell in enumerate(header_cells):
-        txt = normalize_header(cell.text)
+        txt = normalize_header(cell["text"])
         if txt:
             header_index[txt] = idx
 
@@ -283,14 +375,12 @@ def scrape_table(driver) -> List[PaperRow]:
         "avg_rating", avg_rating_idx,
     )
 
-    records: List[PaperRow] = []
-
     # Data rows are all rows after the header row
     data_rows = rows[header_idx_in_rows + 1 :]
     print(f"Found {len(data_rows)} data rows (after header row index {header_idx_in_rows})")
 
     for r in tqdm(data_rows):
-        cells = r.find_elements(By.XPATH, ".//td")
+        cells = [c for c in r["cells"] if c["tag"] == "td"]
         if not cells:
             continue  # skip non-data rows
 
@@ -299,7 +389,7 @@ def scrape_table(driver) -> List[PaperRow]:
                 return ""
             if idx < 0 or idx >= len(cells):
                 return ""
-            return cells[idx].text.strip()
+            return cells[idx]["text"].strip()
 
         title = safe_cell(title_idx)
         if not title:
@@ -316,7 +406,7 @@ def scrape_table(driver) -> List[PaperRow]:
         else:
             affiliation = ""
 
-        openreview_urls, neurips_urls, all_urls = extract_urls_from_row(r)
+        openreview_urls, neurips_urls, all_urls = extract_urls_from_row(r["hrefs"])
 
         rec = PaperRow(
             title=title,
@@ -330,9 +420,7 @@ def scrape_table(driver) -> List[PaperRow]:
             neurips_urls=";".join(neurips_urls),
             all_urls=";".join(all_urls),
         )
-        records.append(rec)
-
-    return records
+        yield rec
 
 
 def main():
@@ -341,29 +429,36 @@ def main():
         print(f"Opening {URL} ...")
         driver.get(URL)
 
-        # Let the page load JS
-        time.sleep(5)
-
-        print(
-            "\nPlease now click 'Click to Fetch All' in the browser window "
-            "until the status under the table shows all records loaded."
-        )
-        input("When you're sure all records are loaded, press ENTER here to continue... ")
-
-        # Short extra wait to let any remaining rows render
-        time.sleep(5)
+        print("Fetching all records ...")
+        try:
+            wait_for_all_rows_loaded(driver)
+        except TimeoutException:
+            print(
+                "\nCould not confirm that all records loaded. Please click 'Click to Fetch All' "
+                "in the browser window until the status under the table shows all records loaded."
+            )
+            input("When you're sure all records are loaded, press ENTER here to continue... ")
 
         print("Scraping table ...")
-        records = scrape_table(driver)
-
-        print(f"Writing {len(records)} rows to {OUTPUT_CSV}")
-        if records:
-            fieldnames = list(asdict(records[0]).keys())
-            with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                for rec in records:
-                    writer.writerow(asdict(rec))
+        # Rows are written as they are parsed rather than collected first, into
+        # a temp file that only replaces OUTPUT_CSV once the whole table is in
+        tmp_path = OUTPUT_CSV + ".tmp"
+        n_rows = 0
+        try:
+            with open(tmp_path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+                writer = csv.writer(f)
+                writer.writerow(PAPER_FIELDS)
+                for rec in scrape_table(driver):
+                    writer.writerow(paper_values(rec))
+                    n_rows += 1
+            if n_rows:
+                os.replace(tmp_path, OUTPUT_CSV)
+                print(f"Wrote {n_rows} rows to {OUTPUT_CSV}")
+            else:
+                print(f"No rows scraped; leaving {OUTPUT_CSV} untouched")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
         print("Done.")
     finally:
@@ -1,17 +1,58 @@
 import asyncio
+import hashlib
 import os
+import time
 from backend import rag
 
+# Paper texts fetched by earlier runs, one file per URL
+FETCH_CACHE_DIR = ".verify_rag_cache"
+# fetch_paper_text reports failures as text starting with one of these
+FETCH_ERROR_PREFIXES = ("Could not determine PDF URL", "URL ", "Error fetching paper")
+
 # Mock environment variables if needed
 os.environ["OPENAI_API_KEY"] = "sk-mock-key"
 
+async def fetch_papers_cached(urls):
+    """
+    fetch_multiple_papers, but texts fetched successfully on an earlier run
+    are read from FETCH_CACHE_DIR instead of the network.
+    """
+    paths = [
+        os.path.join(FETCH_CACHE_DIR, hashlib.sha256(url.encode()).hexdigest() + ".txt")
+        for url in urls
+    ]
+    texts = [None] * len(urls)
+    for i, path in enumerate(paths):
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                texts[i] = f.read()
+
+    missing = [i for i, text in enumerate(texts) if text is None]
+    if missing:
+        fetched = await rag.fetch_multiple_papers([urls[i] for i in missing])
+        os.makedirs(FETCH_CACHE_DIR, exist_ok=True)
+        for i, text in zip(missing, fetched):
+            texts[i] = text
+            if not text.startswith(FETCH_ERROR_PREFIXES):
+                with open(paths[i], "w", encoding="utf-8") as f:
+                    f.write(text)
+    print(f"{len(urls) - len(missing)} of {len(urls)} texts read from {FETCH_CACHE_DIR}")
+    return texts
+
 async def test_fetch():
     print("Testing fetch_multiple_papers...")
-    # Use a dummy URL or a real one if possible, but let's try a fake one to see error handling
-    urls = ["https://example.com/paper.pdf"]
-    texts = await rag.fetch_multiple_papers(urls)
-    print(f"Fetched {len(texts)} texts.")
-    print(f"First text prefix: {texts[0][:100]}")
+    # Use a dummy URL or a real one if possible, but let's try fake ones to see error handling.
+    # Several OpenReview URLs go out together (fetch_multiple_papers runs them
+    # concurrently, bounded by rag.FETCH_CONCURRENCY), so the elapsed time
+    # should be close to one request, not the sum.
+    urls = ["https://example.com/paper.pdf"] + [
+        f"https://openreview.net/forum?id=verify-rag-{i}" for i in range(4)
+    ]
+    start = time.perf_counter()
+    texts = await fetch_papers_cached(urls)
+    print(f"Fetched {len(texts)} texts in {time.perf_counter() - start:.2f}s.")
+    for url, text in zip(urls, texts):
+        print(f"{url}: {text[:100]}")
 
 def test_answer():
     print("\nTesting answer_question with OpenAI...")
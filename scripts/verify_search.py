@@ -2,11 +2,13 @@ import requests
 import json
 
 BASE_URL = "http://localhost:8000"
+# One keep-alive connection pool shared by all the checks
+SESSION = requests.Session()
 
 def test_filters():
     print("Testing /filters...")
     try:
-        response = requests.get(f"{BASE_URL}/filters")
+        response = SESSION.get(f"{BASE_URL}/filters")
         if response.status_code == 200:
             filters = response.json()
             print(f"Filters keys: {filters.keys()}")
@@ -24,7 +26,7 @@ def test_search():
             "query": "language models",
             "limit": 5
         }
-        response = requests.post(f"{BASE_URL}/search", json=payload)
+        response = SESSION.post(f"{BASE_URL}/search", json=payload)
         if response.status_code == 200:
             results = response.json()
             print(f"Search results count: {len(results)}")
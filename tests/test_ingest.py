@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from backend import ingest
+
+
+class CountingModel:
+    """Stands in for the SentenceTransformer; records what gets encoded."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, documents, **kwargs):
+        self.encoded.extend(documents)
+        return np.ones((len(documents), 3), dtype=np.float32)
+
+
+def write_papers(path, titles):
+    df = pd.DataFrame({c: [""] * len(titles) for c in ingest.INGEST_COLUMNS})
+    df = df.assign(**{
+        "title": titles,
+        "authors": ["A. Author"] * len(titles),
+        "affiliation": ["Some University"] * len(titles),
+        "neurips_abstract": [f"About {t}." for t in titles],
+        "neurips_starttime": ["2025-12-03T11:00:00-08:00"] * len(titles),
+        "neurips_event_type": ["Poster"] * len(titles),
+        "neurips_session": ["San Diego Poster Session 1"] * len(titles),
+        "avg_rating": [5.0] * len(titles),
+    })
+    df.to_csv(path, index=False)
+
+
+def test_inserting_a_paper_only_embeds_that_paper(tmp_path, monkeypatch):
+    csv_path = tmp_path / "papers.csv"
+    monkeypatch.setattr(ingest, "CSV_PATH", str(csv_path))
+    monkeypatch.setattr(ingest, "EVENTS_CSV_PATH", str(tmp_path / "missing_events.csv"))
+    monkeypatch.setattr(ingest, "EXPO_CSV_PATH", str(tmp_path / "missing_expo.csv"))
+    monkeypatch.setattr(ingest, "CHROMA_PATH", str(tmp_path / "chroma"))
+    monkeypatch.setattr(ingest, "write_filters", lambda filters: None)
+    model = CountingModel()
+    monkeypatch.setattr(ingest, "load_embedding_model", lambda device: model)
+
+    write_papers(csv_path, ["Beta paper", "Delta paper", "Gamma paper"])
+    ingest.main(full_rebuild=True)
+    assert len(model.encoded) == 3
+
+    # "Alpha" sorts before every existing title, so positional ids would all shift
+    model.encoded.clear()
+    write_papers(csv_path, ["Alpha paper", "Beta paper", "Delta paper", "Gamma paper"])
+    ingest.main(full_rebuild=False)
+    assert len(model.encoded) == 1
+    assert model.encoded[0].startswith("Title: Alpha paper\n")
+
+    collection = ingest.chromadb.PersistentClient(path=ingest.CHROMA_PATH).get_collection(ingest.COLLECTION_NAME)
+    assert collection.count() == 4
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import merge_neurips
+
+
+def test_extract_openreview_ids_pc_picks_first_forum_url():
+    urls = pd.Series([
+        "https://openreview.net/pdf?id=pdf1; https://openreview.net/forum?id=abc&noteId=x",
+        "https://openreview.net/pdf?id=z",
+        np.nan,
+    ])
+    assert merge_neurips.extract_openreview_ids_pc(urls).tolist() == ["abc", "", ""]
+
+
+def test_extract_openreview_ids_pc_all_nan_column():
+    # read_csv gives a float64 column when no row has a URL
+    urls = pd.Series([np.nan, np.nan])
+    assert merge_neurips.extract_openreview_ids_pc(urls).tolist() == ["", ""]
+
+
+def test_extract_openreview_ids_pc_empty_column():
+    urls = pd.Series([], dtype="float64")
+    assert merge_neurips.extract_openreview_ids_pc(urls).tolist() == []